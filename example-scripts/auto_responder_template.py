@@ -19,17 +19,27 @@ def script_function():
     - Consider filtering to specific channels or users to avoid spam
     - Without any check it responds to everyone in all servers.
       Adding a quick user ID filter keeps it targeted.
+    - Keywords match whole words, so "hi" does not fire on "this". For many
+      triggers, regexes or per-server scopes, use the TriggerEngine in
+      event_listener_example.py instead of growing this check
+    - With event_listener_example loaded, replies count against its shared
+      limits (`<p>event ratelimit`)
     """
+    import re
+
+    TARGET_USER_ID = 839561905403068467
+    KEYWORDS = re.compile(r"\b(?:hello|hi)\b", re.IGNORECASE)
 
     @bot.listen("on_message")
     async def hello_listener(message):
-        TARGET_USER_ID = 839561905403068467
         if message.author.id == bot.user.id:
             return
         if message.author.id != TARGET_USER_ID:
             return
-        content = message.content.lower()
-        if "hello" in content or "hi" in content:
+        if KEYWORDS.search(message.content):
+            limiter = getattr(bot, "response_limiter", None)
+            if limiter and not limiter.allow(message.channel.id, message.author.id, "hello responder"):
+                return
             await message.channel.send("Hello!", silent=True)
 
 script_function()
@@ -1,8 +1,8 @@
 @nightyScript(
     name="Rapid Message Cleaner v1.0",
     author="thedorekaczynski",
-    description="Rapidly deletes your messages sent in the past 3 minutes",
-    usage="<p>clean - Starts the cleanup process"
+    description="Rapidly deletes your recent messages in one or more channels",
+    usage="<p>clean [2h/30m/500] [#channels...] OR <p>clean stop"
 )
 def message_cleaner():
     """
@@ -10,27 +10,40 @@ def message_cleaner():
     -------------------------
     
     This script provides a quick way to clean up your recent messages in a channel.
-    It automatically finds and deletes messages you've sent in the past 3 minutes.
+    By default it finds and deletes messages you've sent in the past 3 minutes;
+    a time window or message count can be given instead.
     
     FEATURES:
     - Rapid message deletion
     - Only deletes your own messages
-    - Status updates during cleanup
-    - Rate-limited to avoid API throttling
+    - Time windows (30s, 10m, 2h, 1d) or message counts, across several channels
+    - Status updates during cleanup (at most every few seconds)
+    - Adapts its pace to Discord's rate limits
     - Error handling for failed deletions
     - Auto-deleting status messages
     
     COMMANDS:
-    <p>clean    - Start cleaning messages from the past 3 minutes
+    <p>clean                     - Delete your messages from the past 3 minutes
+    <p>clean <window>            - Delete your messages from the past window (e.g. 2h)
+    <p>clean <count>             - Delete your last <count> messages
+    <p>clean ... #chan1 #chan2   - Clean the given channels instead of this one
+    <p>clean stop                - Stop a running cleanup
     
     EXAMPLE USAGE:
     <p>clean    - "🧹 Starting message cleanup..."
-                - "✅ Cleanup complete! Deleted 5 messages from the past minute."
+                - "✅ Cleanup complete! Deleted 5 messages from the past 3 minutes."
+    <p>clean 2h #general #memes
+    <p>clean 500
     
     BEHAVIOR:
-    - Searches last 100 messages in the channel
-    - Only deletes messages from past 3 minutes
-    - 0.5 second delay between deletions
+    - Pages through channel history while deleting; found messages wait in a
+      small queue so reading and deleting overlap without reading too far ahead
+    - The delay between deletions shrinks while requests go through quickly and
+      grows when Discord reports a rate limit (retry-after) or holds a request back
+    - A count applies to each channel
+    - If Message Range Fetcher (msg_fetch.py) has archived a channel, your
+      archived messages are taken from json/message_archive.db and only
+      messages newer than the archive are paged from Discord
     - Status message auto-deletes after 5 seconds
     
     NOTES:
@@ -39,58 +52,257 @@ def message_cleaner():
     - Safe to use in any channel
     """
     import asyncio
+    import re
+    import sqlite3
     import time
-    from datetime import datetime, timedelta
+    from datetime import datetime, timedelta, timezone
+    from pathlib import Path
     
-    @bot.command(name="clean", description="Rapidly delete messages sent in the past 3 minutes")
+    DEFAULT_WINDOW = 180  # Seconds cleaned by a bare <p>clean
+    QUEUE_SIZE = 50  # Messages found ahead of the deleter at most
+    PROGRESS_INTERVAL = 5.0  # Seconds between status edits
+    MAX_ATTEMPTS = 3  # Tries per message when rate limited
+    WINDOW_UNITS = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+    ARCHIVE_PATH = Path(getScriptsPath()) / "json" / "message_archive.db"  # Kept by msg_fetch.py
+    DISCORD_EPOCH_MS = 1420070400000
+    
+    active = {"task": None}
+    
+    class AdaptivePacer:
+        """
+        Delay between deletions. Each quick success shrinks it a little; a
+        rate limit (a retry-after error, or a call the library held back to
+        wait one out) doubles it, so the pace settles just under the limit.
+        """
+        def __init__(self, delay=0.3, min_delay=0.05, max_delay=10.0, slow_call=1.0):
+            self.delay = delay
+            self.min_delay = min_delay
+            self.max_delay = max_delay
+            self.slow_call = slow_call
+            self.rate_limits = 0
+            
+        def success(self, elapsed):
+            if elapsed >= self.slow_call:
+                self.rate_limits += 1
+                self.delay = min(self.max_delay, self.delay * 2)
+            else:
+                self.delay = max(self.min_delay, self.delay * 0.9)
+                
+        def rate_limited(self, retry_after):
+            """Record a 429 and return how long to wait before retrying"""
+            self.rate_limits += 1
+            self.delay = min(self.max_delay, max(self.delay * 2, retry_after / 2))
+            return retry_after
+            
+        async def wait(self):
+            await asyncio.sleep(self.delay)
+    
+    def retry_after_of(error):
+        """Seconds to wait from a rate-limit error, or None if it is not one"""
+        retry_after = getattr(error, "retry_after", None)
+        if retry_after is None and getattr(error, "status", None) == 429:
+            headers = getattr(getattr(error, "response", None), "headers", None) or {}
+            retry_after = headers.get("Retry-After") or headers.get("X-RateLimit-Reset-After") or 1.0
+        if retry_after is None:
+            return None
+        try:
+            return float(retry_after)
+        except (TypeError, ValueError):
+            return 1.0
+    
+    def parse_clean_args(ctx, args):
+        """Return (seconds, count, channels); raises ValueError on bad input"""
+        seconds, count, channels = None, None, []
+        for token in args.split():
+            mention = re.fullmatch(r"<#(\d+)>|(\d{15,})", token)
+            window = re.fullmatch(r"(\d+)([smhd])", token.lower())
+            if mention:
+                channel = bot.get_channel(int(mention.group(1) or mention.group(2)))
+                if channel is None:
+                    raise ValueError(f"Channel {token} not found.")
+                channels.append(channel)
+            elif window:
+                seconds = int(window.group(1)) * WINDOW_UNITS[window.group(2)]
+            elif token.isdigit() and int(token) > 0:
+                count = int(token)
+            else:
+                raise ValueError(f"Unknown option `{token}`. Use a window like `2h`, a count like `500` or channel mentions.")
+        if seconds is None and count is None:
+            seconds = DEFAULT_WINDOW
+        return seconds, count, channels or [ctx.channel]
+    
+    def describe(seconds, count, channels):
+        """Human-readable cleanup scope for the status message"""
+        parts = []
+        if seconds:
+            for unit, size in (("day", 86400), ("hour", 3600), ("minute", 60)):
+                if seconds >= size and seconds % size == 0:
+                    amount = seconds // size
+                    parts.append(f"from the past {amount} {unit}{'s' if amount != 1 else ''}")
+                    break
+            else:
+                parts.append(f"from the past {seconds} seconds")
+        if count:
+            parts.append(f"(last {count} per channel)" if channels > 1 else f"(last {count})")
+        return " ".join(parts)
+    
+    def archived_own_messages(channel_id, after, count):
+        """
+        (high-water mark, our message IDs newest first) from msg_fetch's
+        archive, or None if it does not cover the window. Runs in a thread.
+        """
+        if not ARCHIVE_PATH.exists():
+            return None
+        after_id = (int(after.timestamp() * 1000) - DISCORD_EPOCH_MS) << 22 if after else 0
+        try:
+            conn = sqlite3.connect(f"file:{ARCHIVE_PATH}?mode=ro", uri=True)
+        except sqlite3.Error:
+            return None
+        try:
+            coverage = conn.execute("SELECT low, high FROM coverage WHERE channel_id = ?", (channel_id,)).fetchone()
+            if coverage is None or after_id >= coverage[1]:
+                return None
+            low, high = coverage
+            ids = [message_id for message_id, in conn.execute(
+                "SELECT id FROM messages WHERE channel_id = ? AND author_id = ? AND id > ? AND id >= ? AND deleted = 0 "
+                "ORDER BY id DESC LIMIT ?",
+                (channel_id, bot.user.id, after_id, low, count or -1),
+            )]
+            # Usable if the archive reaches back past the window, or already holds enough messages
+            if low <= after_id + 1 or (count and len(ids) >= count):
+                return high, ids
+            return None
+        except sqlite3.Error:
+            return None
+        finally:
+            conn.close()
+    
+    async def own_messages(channel, after, count, stats):
+        """Our messages in the window, newest first; archived ones need no history paging"""
+        loop = asyncio.get_running_loop()
+        archived = await loop.run_in_executor(None, archived_own_messages, channel.id, after, count)
+        history_after = discord.Object(id=archived[0]) if archived else after
+        async for message in channel.history(limit=None, after=history_after, oldest_first=False):
+            stats["scanned"] += 1
+            if message.author.id == bot.user.id:
+                yield message
+        if archived:
+            for message_id in archived[1]:
+                yield channel.get_partial_message(message_id)
+    
+    async def find_messages(channels, seconds, count, queue, skip_ids, stats):
+        """Page through history and queue our own messages, newest first"""
+        after = datetime.now(timezone.utc) - timedelta(seconds=seconds) if seconds else None
+        try:
+            for channel in channels:
+                found = 0
+                async for message in own_messages(channel, after, count, stats):
+                    if message.id in skip_ids:
+                        continue
+                    await queue.put(message)  # Waits while the deleter is QUEUE_SIZE behind
+                    found += 1
+                    if count and found >= count:
+                        break
+        except Exception:
+            await queue.put(None)  # Let the deleter finish what was queued
+            raise
+        await queue.put(None)
+    
+    async def delete_messages(queue, pacer, stats, report):
+        while True:
+            message = await queue.get()
+            if message is None:
+                return
+            for attempt in range(MAX_ATTEMPTS):
+                started = time.monotonic()
+                try:
+                    await message.delete()
+                except Exception as e:
+                    retry_after = retry_after_of(e)
+                    if retry_after is not None:
+                        await asyncio.sleep(pacer.rate_limited(retry_after))
+                        continue
+                    if getattr(e, "status", None) != 404:  # 404: already deleted
+                        stats["failed"] += 1
+                        print(f"Error deleting message: {str(e)}", type_="WARNING")
+                    break
+                pacer.success(time.monotonic() - started)
+                stats["deleted"] += 1
+                break
+            else:
+                stats["failed"] += 1
+            await report()
+            await pacer.wait()
+    
+    @bot.command(name="clean", description="Rapidly delete your recent messages")
     async def clean_command(ctx, *, args: str = ""):
         await ctx.message.delete()  # Delete the command message
         
-        # Always use the channel where the command was sent
-        channel = ctx.channel
+        if args.strip().lower() == "stop":
+            task = active["task"]
+            if task and not task.done():
+                task.cancel()
+            else:
+                await ctx.send("No cleanup is running.", delete_after=5)
+            return
+            
+        if active["task"] and not active["task"].done():
+            await ctx.send("A cleanup is already running. Use `<p>clean stop` to stop it.", delete_after=5)
+            return
+            
+        try:
+            seconds, count, channels = parse_clean_args(ctx, args)
+        except ValueError as e:
+            await ctx.send(f"❌ {e}", delete_after=10)
+            return
             
         status_msg = await ctx.send("🧹 Starting message cleanup...")
+        active["task"] = asyncio.current_task()
+        
+        stats = {"scanned": 0, "deleted": 0, "failed": 0}
+        pacer = AdaptivePacer()
+        started = time.monotonic()
+        last_report = {"at": started}
+        window = describe(seconds, count, len(channels))
+        where = f" in {len(channels)} channels" if len(channels) > 1 else ""
         
+        async def report():
+            # Status edits share the rate limit budget, so keep them rare
+            now = time.monotonic()
+            if now - last_report["at"] < PROGRESS_INTERVAL:
+                return
+            last_report["at"] = now
+            try:
+                await status_msg.edit(content=f"🧹 Deleted {stats['deleted']} messages so far ({stats['scanned']} scanned, {pacer.delay:.2f}s between deletions)...")
+            except Exception:
+                pass
+        
+        queue = asyncio.Queue(maxsize=QUEUE_SIZE)
+        finder = asyncio.create_task(find_messages(channels, seconds, count, queue, {status_msg.id}, stats))
         try:
-            # Calculate the cutoff time (3 minutes ago)
-            current_time = time.time()
-            three_minutes_ago_ts = current_time - 180  # 180 seconds = 3 minutes
-            
-            deleted_count = 0
-            
-            # Get messages in channel and filter for our own messages in the past 3 minutes
-            async for message in channel.history(limit=100):
-                # Skip the status message
-                if message.id == status_msg.id:
-                    continue
-                    
-                # Only delete our own messages
-                if message.author.id == bot.user.id:
-                    # Convert message timestamp to UNIX timestamp for comparison
-                    msg_ts = message.created_at.timestamp()
-                    
-                    # Check if message is within the time frame
-                    if msg_ts > three_minutes_ago_ts:
-                        try:
-                            await message.delete()
-                            deleted_count += 1
-                            # Wait 0.5 seconds between deletions to avoid rate limits
-                            await asyncio.sleep(0.5)
-                        except Exception as e:
-                            print(f"Error deleting message: {str(e)}", type_="WARNING")
+            await delete_messages(queue, pacer, stats, report)
+            await finder  # Re-raise a history error, if any
             
             # Update status message with results
-            await status_msg.edit(content=f"✅ Cleanup complete! Deleted {deleted_count} messages from the past 3 minutes.")
+            failed = f", {stats['failed']} failed" if stats["failed"] else ""
+            await status_msg.edit(content=f"✅ Cleanup complete! Deleted {stats['deleted']} messages {window}{where}{failed} in {time.monotonic() - started:.0f}s.")
+            
+        except asyncio.CancelledError:
+            await status_msg.edit(content=f"⏹️ Cleanup stopped. Deleted {stats['deleted']} messages.")
             
-            # Delete status message after 5 seconds
-            await asyncio.sleep(5)
-            try:
-                await status_msg.delete()
-            except:
-                pass
-                
         except Exception as e:
             print(f"Error in clean command: {str(e)}", type_="ERROR")
             await status_msg.edit(content=f"❌ Error during cleanup: {str(e)}")
+            
+        finally:
+            finder.cancel()
+            active["task"] = None
+            
+        # Delete status message after 5 seconds
+        await asyncio.sleep(5)
+        try:
+            await status_msg.delete()
+        except:
+            pass
 
-message_cleaner()  # Initialize the script
\ No newline at end of file
+message_cleaner()  # Initialize the script
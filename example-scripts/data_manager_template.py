@@ -17,36 +17,281 @@ def script_function():
     <p>delnote <index> - Remove a note by number
 
     NOTES:
-    - Uses a simple JSON file named `notes.json`
+    - Uses a simple JSON file named `notes.json`, kept in memory by a JsonStore
+      helper (README 4.2.1) that writes changes atomically in the background
+    - Set the `simple_notes_backend` config key to `sqlite` to store notes in
+      `notes.db` instead (README 4.2.2); existing notes are imported once
     - Demonstrates the data management pattern (Section 6.5)
     """
     import json
+    import os
+    import time
+    import asyncio
+    import atexit
+    import sqlite3
+    from concurrent.futures import ThreadPoolExecutor
     from pathlib import Path
 
     DATA_FILE = Path("notes.json")
 
-    def load_notes():
-        if DATA_FILE.exists():
-            with DATA_FILE.open("r") as f:
-                return json.load(f)
-        return []
+    class JsonStore:
+        """
+        JSON document kept in memory. load() checks the file's mtime (one
+        stat call) at most every `check_interval` seconds and re-reads the file
+        only when it changed (e.g. after a manual edit). Saves are debounced and
+        written atomically (temp file + rename) in a worker thread.
+        """
+        def __init__(self, path, default, delay=1.0, check_interval=2.0):
+            self.path = Path(path)
+            self.default = default
+            self.delay = delay
+            self.check_interval = check_interval
+            self.next_check = 0.0
+            self.data = None
+            self.mtime = None
+            self.dirty = False
+            self.save_task = None
 
-    def save_notes(notes):
-        with DATA_FILE.open("w") as f:
-            json.dump(notes, f)
+        def load(self):
+            """Return the in-memory document, reloading it if the file changed on disk"""
+            now = time.monotonic()
+            if self.data is not None and now < self.next_check:
+                return self.data
+            self.next_check = now + self.check_interval
+            try:
+                mtime = self.path.stat().st_mtime_ns
+            except FileNotFoundError:
+                mtime = None
+            # Unsaved changes win over the file
+            if self.data is None or (mtime != self.mtime and not self.dirty and self.save_task is None):
+                try:
+                    with open(self.path, "r", encoding="utf-8") as f:
+                        self.data = json.load(f)
+                except (FileNotFoundError, json.JSONDecodeError):
+                    self.data = json.loads(json.dumps(self.default))  # fresh copy of the default
+                self.mtime = mtime
+            return self.data
+
+        def save(self, data=None):
+            """Replace (or keep) the document and schedule a debounced write"""
+            if data is not None:
+                self.data = data
+            self.dirty = True
+            try:
+                loop = asyncio.get_running_loop()
+            except RuntimeError:
+                self.flush()  # No event loop (e.g. a UI callback): write right away
+                return
+            if self.save_task is None:
+                self.save_task = loop.create_task(self.write_later())
+
+        async def write_later(self):
+            try:
+                await asyncio.sleep(self.delay)
+                while self.dirty:
+                    self.dirty = False
+                    payload = json.dumps(self.data, indent=4)
+                    await asyncio.get_running_loop().run_in_executor(None, self.write, payload)
+            except Exception as e:
+                print(f"Error saving {self.path.name}: {e}", type_="ERROR")
+            finally:
+                self.save_task = None
+
+        def write(self, payload):
+            tmp_path = self.path.with_suffix(self.path.suffix + ".tmp")
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.write(payload)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.path)
+            self.mtime = self.path.stat().st_mtime_ns
+
+        def flush(self):
+            """Write pending changes immediately (blocking)"""
+            if self.dirty:
+                self.dirty = False
+                self.write(json.dumps(self.data, indent=4))
+
+    class SqliteStore:
+        """
+        Documents (key -> JSON value) and item collections in one SQLite file in
+        WAL mode. Adding or removing an item touches one row instead of rewriting
+        a whole JSON file. A dedicated worker thread owns the connection and runs
+        every statement in submission order.
+        """
+        def __init__(self, path):
+            self.path = Path(path)
+            self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="sqlite-store")
+            self.conn = None
+            self.executor.submit(self.connect).result()
+
+        def connect(self):
+            # Only the worker thread uses the connection; close() runs after it has stopped
+            self.conn = sqlite3.connect(self.path, check_same_thread=False)
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.execute("PRAGMA synchronous=NORMAL")
+            self.conn.executescript("""
+                CREATE TABLE IF NOT EXISTS documents (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+                CREATE TABLE IF NOT EXISTS items (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    collection TEXT NOT NULL,
+                    value TEXT NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS items_by_value ON items (collection, value);
+                CREATE TABLE IF NOT EXISTS migrations (source TEXT PRIMARY KEY, migrated_at TEXT NOT NULL);
+            """)
+            self.conn.commit()
+
+        def execute(self, sql, params=(), fetch=None):
+            """Run one parameterized statement in a transaction (worker thread only)"""
+            with self.conn:
+                cursor = self.conn.execute(sql, params)
+                if fetch == "one":
+                    return cursor.fetchone()
+                if fetch == "all":
+                    return cursor.fetchall()
+                return cursor.rowcount
+
+        async def query(self, sql, params=(), fetch=None):
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self.executor, self.execute, sql, params, fetch)
+
+        # Documents: the same load/save shape as JsonStore, one row per key
+        async def load(self, key, default=None):
+            row = await self.query("SELECT value FROM documents WHERE key = ?", (key,), "one")
+            return json.loads(row[0]) if row else default
+
+        async def save(self, key, value):
+            await self.query("INSERT OR REPLACE INTO documents (key, value) VALUES (?, ?)", (key, json.dumps(value)))
+
+        # Collections: ordered lists of JSON values
+        async def items(self, collection):
+            rows = await self.query("SELECT value FROM items WHERE collection = ? ORDER BY id", (collection,), "all")
+            return [json.loads(value) for value, in rows]
+
+        async def add(self, collection, value, unique=True):
+            """Append a value; with unique=True it is skipped if already present. Returns True if added"""
+            payload = json.dumps(value)
+            if unique:
+                sql = ("INSERT INTO items (collection, value) SELECT ?, ? WHERE NOT EXISTS "
+                       "(SELECT 1 FROM items WHERE collection = ? AND value = ?)")
+                return await self.query(sql, (collection, payload, collection, payload)) > 0
+            return await self.query("INSERT INTO items (collection, value) VALUES (?, ?)", (collection, payload)) > 0
+
+        async def remove(self, collection, value):
+            """Remove every occurrence of a value. Returns True if anything was removed"""
+            return await self.query("DELETE FROM items WHERE collection = ? AND value = ?", (collection, json.dumps(value))) > 0
+
+        async def pop(self, collection, index):
+            """Remove and return the item at a 0-based position, or None if out of range"""
+            def pop_item():
+                with self.conn:
+                    row = self.conn.execute(
+                        "SELECT id, value FROM items WHERE collection = ? ORDER BY id LIMIT 1 OFFSET ?",
+                        (collection, index),
+                    ).fetchone()
+                    if row:
+                        self.conn.execute("DELETE FROM items WHERE id = ?", (row[0],))
+                return json.loads(row[1]) if row else None
+            return await asyncio.get_running_loop().run_in_executor(self.executor, pop_item)
+
+        async def contains(self, collection, value):
+            row = await self.query("SELECT 1 FROM items WHERE collection = ? AND value = ? LIMIT 1", (collection, json.dumps(value)), "one")
+            return row is not None
+
+        def migrate_json(self, json_path):
+            """
+            Queue a one-shot import of a JSON file: a top-level list becomes the
+            collection "<file stem>", a dict's list values become "<stem>/<key>"
+            collections and its other values "<stem>/<key>" documents. Each file
+            is imported once; the JSON file is left in place.
+            """
+            return self.executor.submit(self.import_json, Path(json_path))
+
+        def import_json(self, json_path):
+            source = str(json_path.resolve())
+            if not json_path.exists() or self.execute("SELECT 1 FROM migrations WHERE source = ?", (source,), "one"):
+                return 0
+            try:
+                with open(json_path, "r", encoding="utf-8") as f:
+                    document = json.load(f)
+            except (OSError, json.JSONDecodeError) as e:
+                print(f"Skipping migration of {json_path.name}: {e}", type_="ERROR")
+                return 0
+
+            stem = json_path.stem
+            if isinstance(document, list):
+                collections, documents = {stem: document}, {}
+            elif isinstance(document, dict):
+                collections = {f"{stem}/{key}": value for key, value in document.items() if isinstance(value, list)}
+                documents = {f"{stem}/{key}": value for key, value in document.items() if not isinstance(value, list)}
+            else:
+                collections, documents = {}, {stem: document}
+
+            rows = [(name, json.dumps(value)) for name, values in collections.items() for value in values]
+            with self.conn:
+                self.conn.executemany("INSERT INTO items (collection, value) VALUES (?, ?)", rows)
+                self.conn.executemany(
+                    "INSERT OR REPLACE INTO documents (key, value) VALUES (?, ?)",
+                    [(key, json.dumps(value)) for key, value in documents.items()],
+                )
+                self.conn.execute(
+                    "INSERT INTO migrations (source, migrated_at) VALUES (?, datetime('now'))", (source,)
+                )
+            print(f"Migrated {len(rows)} items from {json_path.name} to {self.path.name}", type_="INFO")
+            return len(rows)
+
+        def close(self):
+            """Finish queued statements, then close (checkpoints the WAL)"""
+            self.executor.shutdown(wait=True)
+            self.conn.close()
+
+    # Set simple_notes_backend to "sqlite" to keep notes in notes.db instead
+    USE_SQLITE = getConfigData().get("simple_notes_backend", "json") == "sqlite"
+    NOTES_COLLECTION = DATA_FILE.stem  # The migrator imports a top-level list under the file stem
+
+    if USE_SQLITE:
+        db = SqliteStore(DATA_FILE.with_suffix(".db"))
+        atexit.register(db.close)
+        db.migrate_json(DATA_FILE)
+    else:
+        notes_store = JsonStore(DATA_FILE, [])
+        atexit.register(notes_store.flush)
+
+    async def load_notes():
+        if USE_SQLITE:
+            return await db.items(NOTES_COLLECTION)
+        return notes_store.load()
+
+    async def add_note(text):
+        if USE_SQLITE:
+            await db.add(NOTES_COLLECTION, text, unique=False)
+            return
+        notes = notes_store.load()
+        notes.append(text)
+        notes_store.save(notes)
+
+    async def pop_note(i):
+        """Remove and return the note at 0-based index i, or None"""
+        if USE_SQLITE:
+            return await db.pop(NOTES_COLLECTION, i) if i >= 0 else None
+        notes = notes_store.load()
+        if 0 <= i < len(notes):
+            removed = notes.pop(i)
+            notes_store.save(notes)
+            return removed
+        return None
 
     @bot.command(name="addnote", description="Add a note.")
     async def add_note_cmd(ctx, *, text: str):
         await ctx.message.delete()
-        notes = load_notes()
-        notes.append(text)
-        save_notes(notes)
+        await add_note(text)
         await ctx.send("Note added.", silent=True)
 
     @bot.command(name="notes", description="List notes.")
     async def list_notes_cmd(ctx):
         await ctx.message.delete()
-        notes = load_notes()
+        notes = await load_notes()
         if notes:
             msg = "\n".join(f"{i+1}. {n}" for i, n in enumerate(notes))
             await ctx.send(msg, silent=True)
@@ -61,10 +306,8 @@ def script_function():
         except ValueError:
             await ctx.send("Index must be a number.", silent=True)
             return
-        notes = load_notes()
-        if 0 <= i < len(notes):
-            removed = notes.pop(i)
-            save_notes(notes)
+        removed = await pop_note(i)
+        if removed is not None:
             await ctx.send(f"Removed note: {removed}", silent=True)
         else:
             await ctx.send("Invalid index.", silent=True)
@@ -2,7 +2,7 @@
     name="Event Listener Example",
     author="thedorekaczynski",
     description="Demonstrates the use of event listeners",
-    usage="<p>event on/off OR <p>event status"
+    usage="<p>event on/off OR <p>event status OR <p>event trigger add/regex/remove/list"
 )
 def event_listener_example():
     """
@@ -15,46 +15,487 @@ def event_listener_example():
     COMMANDS:
     <p>event on/off - Enable or disable the event listener
     <p>event status - Check if the event listener is enabled
+    <p>event trigger add <keyword> | <response> [| scope] - Add a keyword trigger
+    <p>event trigger regex <pattern> | <response> [| scope] - Add a regex trigger
+    <p>event trigger remove <number> - Remove a trigger
+    <p>event trigger list - List all triggers
+    <p>event ratelimit [channel/user <burst> <cooldown>] - Show or set response limits
     
     EXAMPLES:
     <p>event on - Enable the event listener
     <p>event off - Disable the event listener
     <p>event status - Check if the event listener is enabled
+    <p>event trigger add good morning | Morning, {mention}! - Reply everywhere
+    <p>event trigger regex \bv?\d+\.\d+\b | Version {match} noted. | channel - Only in this channel
+    <p>event trigger add gm | gm! | user:123456789 - Only for one user
+    <p>event ratelimit channel 3 10 - At most 3 quick replies per channel, then 1 every 10s
     
     NOTES:
     - The event listener responds to messages containing 'hello', 'hi', or 'hey'
+      by default; triggers are stored in json/event_triggers.json
+    - Responses can use {mention} and {match}; scope is `server`, `channel`
+      or `user:<id>` and limits where a trigger fires
+    - All triggers are compiled into a single matcher that is rebuilt only when
+      the triggers change, so each message is scanned once; regex triggers
+      therefore cannot use inline flags like (?i), named groups or
+      backreferences (they are rejected when added)
+    - Replies are rate limited per channel and per user by a ResponseLimiter
+      (token buckets) published as bot.response_limiter, which the other
+      auto-responder scripts use too; suppressed replies are counted and shown
+      by <p>event ratelimit
+    - Those scripts look the limiter up on every reply, so load order does not
+      matter. While this script is not loaded they find none and reply
+      without limits
     - The event listener is enabled by default
+    - Config values are read through a cached ConfigView (README 4.1.1), so the
+      message listener does not call getConfigData() on every message
     - The event listener ignores messages from the bot itself
     """
     
+    import json
+    import re
+    import time
+    from collections import deque
+    from pathlib import Path
+    
     # Configuration key for enabling/disabling the event listener
     ENABLED_KEY = "event_listener_enabled"
+    CONFIG_OWNER = "event_listener_example"  # Reloads replace this script's config callbacks
+    
+    BASE_DIR = Path(getScriptsPath()) / "json"
+    TRIGGERS_FILE = BASE_DIR / "event_triggers.json"
+    BASE_DIR.mkdir(parents=True, exist_ok=True)
+    
+    # How often the listener checks whether the triggers file was edited by hand
+    TRIGGER_FILE_CHECK_SECONDS = 5.0
+    
+    DEFAULT_TRIGGERS = [
+        {"pattern": keyword, "response": "Hello, {mention}! I noticed you said '{match}'."}
+        for keyword in ("hello", "hi", "hey")
+    ]
+    
+    class ConfigView:
+        """
+        Cached copy of getConfigData(). get() is a dict lookup; the copy is
+        refreshed after every set() and otherwise at most every
+        `refresh_interval` seconds, which picks up changes made elsewhere
+        (other scripts, the Nighty UI). on_change() registers callback(value)
+        to run whenever a key's value changes, once per owner.
+        """
+        def __init__(self, refresh_interval=5.0):
+            self.refresh_interval = refresh_interval
+            self.callbacks = {}
+            self.values = dict(getConfigData())
+            self.next_refresh = time.monotonic() + refresh_interval
+    
+        def refresh(self):
+            """Re-read the config and run the callbacks of keys that changed"""
+            old, self.values = self.values, dict(getConfigData())
+            self.next_refresh = time.monotonic() + self.refresh_interval
+            for key, callbacks in list(self.callbacks.items()):
+                value = self.values.get(key)
+                if old.get(key) == value:
+                    continue
+                for callback in list(callbacks.values()):
+                    try:
+                        callback(value)
+                    except Exception as e:
+                        print(f"Config callback for '{key}' failed: {e}", type_="ERROR")
+    
+        def get(self, key, default=None):
+            if time.monotonic() >= self.next_refresh:
+                self.refresh()
+            return self.values.get(key, default)
+    
+        def set(self, key, value):
+            updateConfigData(key, value)
+            self.refresh()
+    
+        def on_change(self, key, callback, owner=None):
+            """
+            Call callback(new_value) when `key` changes. Callbacks are handed on
+            to the next view when a script reloads, so pass the script's name as
+            `owner`: registering again replaces that owner's callback instead of
+            adding another. Returns a function that unregisters the callback.
+            """
+            callbacks = self.callbacks.setdefault(key, {})
+            token = owner if owner is not None else object()
+            callbacks[token] = callback
+            
+            def unregister():
+                if callbacks.get(token) is callback:
+                    del callbacks[token]
+            return unregister
+    
+    # Shared objects (bot.config_view, and bot.response_limiter below) are
+    # replaced on every load, so edits to their classes take effect after a
+    # reload. The new view takes over the old one's callbacks; scripts look
+    # the view up when they load, so a set() in any script updates them all.
+    previous = getattr(bot, "config_view", None)
+    config = bot.config_view = ConfigView()
+    if previous is not None:
+        config.callbacks, previous.callbacks = previous.callbacks, {}
     
     # Initialize the configuration if it doesn't exist
-    if getConfigData().get(ENABLED_KEY) is None:
-        updateConfigData(ENABLED_KEY, True)  # Enabled by default
+    if config.get(ENABLED_KEY) is None:
+        config.set(ENABLED_KEY, True)  # Enabled by default
+    
+    # Helper functions for loading and saving the triggers
+    def load_triggers():
+        try:
+            with open(TRIGGERS_FILE, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return [dict(rule) for rule in DEFAULT_TRIGGERS]
+    
+    def save_triggers(rules):
+        with open(TRIGGERS_FILE, "w", encoding="utf-8") as f:
+            json.dump(rules, f, indent=4)
+    
+    def triggers_mtime():
+        try:
+            return TRIGGERS_FILE.stat().st_mtime_ns
+        except FileNotFoundError:
+            return None
+    
+    class TriggerEngine:
+        """
+        Keyword and regex triggers compiled once per rule change: keywords go
+        into one Aho-Corasick automaton (case-insensitive, whole words unless
+        "word" is false), regexes into one combined pattern with a named group
+        per rule. A message is scanned once no matter how many rules exist.
+        Rules may be scoped with "guild", "channel" and "user" IDs; when the
+        combined pattern's first hit is out of scope, the in-scope regexes
+        are searched one by one from there.
+        """
+        def __init__(self, rules=()):
+            self.build(rules)
+
+        @staticmethod
+        def regex_problem(pattern):
+            """Why a regex cannot join the combined pattern, or None if it can"""
+            try:
+                compiled = re.compile(pattern)
+            except re.error as e:
+                return f"invalid regex: {e}"
+            if compiled.flags & ~re.UNICODE:
+                return "inline flags such as (?i) are not supported (matching is already case-insensitive)"
+            if compiled.groupindex or "(?P=" in pattern:
+                return "named groups are not supported"
+            if re.search(r"(?<!\\)(?:\\\\)*\\[1-9]", pattern):
+                return "backreferences are not supported"
+            return None
+
+        def build(self, rules):
+            self.rules = list(rules)
+            goto, fail, out = [{}], [0], [[]]
+            patterns = []
+            self.regexes = []  # (rule index, compiled) for the out-of-scope fallback
+            self.longest = 0
+            for index, rule in enumerate(self.rules):
+                if rule.get("regex"):
+                    # A rule saved before validation (or edited by hand) must not break the rest
+                    problem = self.regex_problem(rule["pattern"])
+                    if problem:
+                        print(f"Skipping trigger `{rule['pattern']}`: {problem}", type_="ERROR")
+                    else:
+                        patterns.append(f"(?P<r{index}>{rule['pattern']})")
+                        self.regexes.append((index, re.compile(rule["pattern"], re.IGNORECASE)))
+                    continue
+                self.longest = max(self.longest, len(rule["pattern"]))
+                node = 0
+                for char in rule["pattern"].lower():
+                    if char not in goto[node]:
+                        goto[node][char] = len(goto)
+                        goto.append({})
+                        fail.append(0)
+                        out.append([])
+                    node = goto[node][char]
+                out[node].append(index)
+            
+            # Breadth-first failure links; each node also inherits its fallback's outputs
+            queue = deque(goto[0].values())
+            while queue:
+                node = queue.popleft()
+                for char, child in goto[node].items():
+                    queue.append(child)
+                    fallback = fail[node]
+                    while fallback and char not in goto[fallback]:
+                        fallback = fail[fallback]
+                    target = goto[fallback].get(char, 0)
+                    fail[child] = target if target != child else 0
+                    out[child] = out[child] + out[fail[child]]
+            self.goto, self.fail, self.out = goto, fail, out
+            self.regex = None
+            if patterns:
+                try:
+                    self.regex = re.compile("|".join(patterns), re.IGNORECASE)
+                except re.error as e:
+                    print(f"Regex triggers disabled: {e}", type_="ERROR")
+
+        def in_scope(self, rule, guild_id, channel_id, user_id):
+            return ((rule.get("guild") is None or rule["guild"] == guild_id)
+                    and (rule.get("channel") is None or rule["channel"] == channel_id)
+                    and (rule.get("user") is None or rule["user"] == user_id))
+
+        def match(self, content, guild_id=None, channel_id=None, user_id=None):
+            """Return (rule, matched text) for the earliest in-scope trigger, or None"""
+            best = None
+            text = content.lower()
+            # Lower-casing can change the length of a few characters; slice the lowered text then
+            source = content if len(text) == len(content) else text
+            goto, fail, out = self.goto, self.fail, self.out
+            node = 0
+            for end, char in enumerate(text):
+                # A keyword ending here or later starts at end - longest + 1 at the earliest
+                if best is not None and end - self.longest + 1 > best[0]:
+                    break
+                while node and char not in goto[node]:
+                    node = fail[node]
+                node = goto[node].get(char, 0)
+                if not out[node]:
+                    continue
+                for index in out[node]:
+                    rule = self.rules[index]
+                    start = end - len(rule["pattern"]) + 1
+                    if rule.get("word", True) and (
+                        (start > 0 and text[start - 1].isalnum())
+                        or (end + 1 < len(text) and text[end + 1].isalnum())
+                    ):
+                        continue
+                    if self.in_scope(rule, guild_id, channel_id, user_id) and (best is None or start < best[0]):
+                        best = (start, rule, source[start:end + 1])
+                    
+            if self.regex is not None:
+                # No regex rule matches before the combined pattern's first hit
+                found = self.regex.search(content)
+                if found and (best is None or found.start() < best[0]):
+                    rule = self.rules[int(found.lastgroup[1:])]
+                    if self.in_scope(rule, guild_id, channel_id, user_id):
+                        best = (found.start(), rule, found.group())
+                    else:
+                        # That rule may have claimed text an in-scope rule also matches
+                        for index, compiled in self.regexes:
+                            rule = self.rules[index]
+                            if not self.in_scope(rule, guild_id, channel_id, user_id):
+                                continue
+                            hit = compiled.search(content, found.start())
+                            if hit and (best is None or hit.start() < best[0]):
+                                best = (hit.start(), rule, hit.group())
+            return best[1:] if best else None
+
+    engine = TriggerEngine(load_triggers())
+    engine_state = {"mtime": triggers_mtime(), "next_check": 0}
+    
+    def current_engine():
+        """The compiled engine, rebuilt if the triggers file changed on disk"""
+        now = time.monotonic()
+        if now >= engine_state["next_check"]:
+            engine_state["next_check"] = now + TRIGGER_FILE_CHECK_SECONDS
+            if triggers_mtime() != engine_state["mtime"]:
+                rebuild_engine(load_triggers())
+        return engine
+    
+    def rebuild_engine(rules):
+        engine.build(rules)
+        engine_state["mtime"] = triggers_mtime()
+    
+    class ResponseLimiter:
+        """
+        Token buckets for auto-responses, one per channel and one per user. A
+        response needs a token from both buckets; each holds up to `burst`
+        tokens and regains one every `cooldown` seconds. Buckets that have
+        refilled while idle are dropped, so memory follows the active keys.
+        Limits come from the config (responder_<channel|user>_burst and
+        responder_<channel|user>_cooldown), read through a ConfigView.
+        """
+        DEFAULTS = {"channel": (5, 6.0), "user": (3, 10.0)}
+    
+        def __init__(self, config, sweep_interval=60.0):
+            self.config = config
+            self.buckets = {}  # (kind, id) -> [tokens, last refill]
+            self.allowed = 0
+            self.suppressed = {}  # (source, kind) -> count
+            self.sweep_interval = sweep_interval
+            self.next_sweep = time.monotonic() + sweep_interval
+            self.reload()
+    
+        def reload(self):
+            """Read the limits from the config"""
+            self.limits = {}
+            for kind, (burst, cooldown) in self.DEFAULTS.items():
+                try:
+                    burst = max(1, int(self.config.get(f"responder_{kind}_burst", burst)))
+                    cooldown = max(0.0, float(self.config.get(f"responder_{kind}_cooldown", cooldown)))
+                except (TypeError, ValueError):
+                    burst, cooldown = self.DEFAULTS[kind]
+                self.limits[kind] = (burst, cooldown)
+    
+        def configure(self, kind, burst, cooldown):
+            """Change and persist the limits for "channel" or "user" buckets"""
+            self.config.set(f"responder_{kind}_burst", int(burst))
+            self.config.set(f"responder_{kind}_cooldown", float(cooldown))
+            self.reload()
+    
+        def refill(self, kind, key, now):
+            burst, cooldown = self.limits[kind]
+            bucket = self.buckets.get((kind, key))
+            if bucket is None:
+                bucket = self.buckets[(kind, key)] = [float(burst), now]
+            else:
+                bucket[0] = min(burst, bucket[0] + (now - bucket[1]) / cooldown) if cooldown else burst
+                bucket[1] = now
+            return bucket
+    
+        def allow(self, channel_id, user_id, source="responder"):
+            """Take a token from the channel and user buckets, or count a suppressed response"""
+            now = time.monotonic()
+            if now >= self.next_sweep:
+                self.sweep(now)
+            buckets = [(kind, self.refill(kind, key, now))
+                       for kind, key in (("channel", channel_id), ("user", user_id)) if key is not None]
+            for kind, bucket in buckets:
+                if bucket[0] < 1:
+                    self.suppressed[(source, kind)] = self.suppressed.get((source, kind), 0) + 1
+                    return False
+            for kind, bucket in buckets:
+                bucket[0] -= 1
+            self.allowed += 1
+            return True
+    
+        def sweep(self, now):
+            """Drop buckets that are full again; a missing bucket starts full anyway"""
+            for key, (tokens, last) in list(self.buckets.items()):
+                burst, cooldown = self.limits[key[0]]
+                if not cooldown or tokens + (now - last) / cooldown >= burst:
+                    del self.buckets[key]
+            self.next_sweep = now + self.sweep_interval
+    
+        def summary(self):
+            lines = [f"{kind}: {burst} burst, 1 per {cooldown:g}s" for kind, (burst, cooldown) in self.limits.items()]
+            lines.append(f"Sent: {self.allowed} | Active buckets: {len(self.buckets)}")
+            for (source, kind), count in sorted(self.suppressed.items()):
+                lines.append(f"Suppressed ({source}, {kind} limit): {count}")
+            return "\n".join(lines)
+    
+    # One limiter per bot: the other auto-responder scripts look up
+    # bot.response_limiter on every reply, so they share these buckets
+    limiter = bot.response_limiter = ResponseLimiter(config)
+    
+    # Pick up limits changed from another script or the UI without polling
+    for kind in ResponseLimiter.DEFAULTS:
+        for setting in ("burst", "cooldown"):
+            config.on_change(f"responder_{kind}_{setting}", lambda value: limiter.reload(), owner=CONFIG_OWNER)
+    
+    config.on_change(ENABLED_KEY, lambda value: print(f"Event listener {'enabled' if value else 'disabled'}", type_="INFO"), owner=CONFIG_OWNER)
+    
+    def parse_scope(scope, ctx):
+        """Turn `server`, `channel` or `user:<id>` into rule scope fields"""
+        scope = scope.strip().lower()
+        if not scope:
+            return {}
+        if scope == "server" and ctx.guild:
+            return {"guild": ctx.guild.id}
+        if scope == "channel":
+            return {"channel": ctx.channel.id}
+        if scope.startswith("user:") and scope[5:].isdigit():
+            return {"user": int(scope[5:])}
+        raise ValueError(f"unknown scope '{scope}' (use server, channel or user:<id>)")
+    
+    async def trigger_command(ctx, args):
+        parts = args.split(maxsplit=1)
+        action = parts[0].lower() if parts else ""
+        rest = parts[1] if len(parts) > 1 else ""
+        rules = load_triggers()
+        
+        if action == "list":
+            if not rules:
+                await ctx.send("No triggers defined.")
+                return
+            lines = []
+            for i, rule in enumerate(rules, 1):
+                kind = "regex" if rule.get("regex") else "keyword"
+                scope = ", ".join(f"{key} {rule[key]}" for key in ("guild", "channel", "user") if rule.get(key))
+                lines.append(f"{i}. [{kind}] `{rule['pattern']}` → {rule['response']}" + (f" ({scope})" if scope else ""))
+            await ctx.send("\n".join(lines)[:1900])
+            
+        elif action in ("add", "regex"):
+            fields = [field.strip() for field in rest.split("|")]
+            if len(fields) < 2 or not fields[0] or not fields[1]:
+                await ctx.send(f"Usage: `<p>event trigger {action} <{'keyword' if action == 'add' else 'pattern'}> | <response> [| scope]`")
+                return
+            rule = {"pattern": fields[0], "response": fields[1]}
+            if action == "regex":
+                # Checked before saving: every regex has to fit into the one combined pattern
+                problem = TriggerEngine.regex_problem(fields[0])
+                if problem:
+                    await ctx.send(f"Cannot add `{fields[0]}`: {problem}.")
+                    return
+                rule["regex"] = True
+            try:
+                rule.update(parse_scope(fields[2] if len(fields) > 2 else "", ctx))
+            except ValueError as e:
+                await ctx.send(str(e))
+                return
+            rules.append(rule)
+            save_triggers(rules)
+            rebuild_engine(rules)
+            await ctx.send(f"Trigger {len(rules)} added.")
+            
+        elif action == "remove" and rest.strip().isdigit():
+            index = int(rest) - 1
+            if not 0 <= index < len(rules):
+                await ctx.send("Invalid trigger number.")
+                return
+            removed = rules.pop(index)
+            save_triggers(rules)
+            rebuild_engine(rules)
+            await ctx.send(f"Removed trigger `{removed['pattern']}`.")
+            
+        else:
+            await ctx.send("Usage: `<p>event trigger add/regex <pattern> | <response> [| scope]`, `<p>event trigger remove <number>` OR `<p>event trigger list`")
     
     @bot.command(name="event", description="Enable or disable the event listener")
     async def event_command(ctx, *, args: str):
         await ctx.message.delete()
         
+        if args.strip().lower().startswith("ratelimit"):
+            parts = args.split()[1:]
+            if not parts:
+                await ctx.send(f"**Auto-response limits**\n{limiter.summary()}")
+                return
+            try:
+                kind, burst, cooldown = parts[0].lower(), int(parts[1]), float(parts[2])
+                if kind not in ("channel", "user") or burst < 1 or cooldown < 0:
+                    raise ValueError
+            except (IndexError, ValueError):
+                await ctx.send("Usage: `<p>event ratelimit channel/user <burst> <cooldown seconds>`")
+                return
+            limiter.configure(kind, burst, cooldown)
+            await ctx.send(f"{kind.title()} limit set to {burst} replies, then 1 every {cooldown:g}s.")
+            return
+        
+        if args.strip().lower().startswith("trigger"):
+            await trigger_command(ctx, args.strip()[len("trigger"):].strip())
+            return
+        
         args = args.strip().lower()
         
         if args == "on":
-            updateConfigData(ENABLED_KEY, True)
+            config.set(ENABLED_KEY, True)
             await ctx.send("Event listener enabled.")
             
         elif args == "off":
-            updateConfigData(ENABLED_KEY, False)
+            config.set(ENABLED_KEY, False)
             await ctx.send("Event listener disabled.")
             
         elif args == "status":
-            enabled = getConfigData().get(ENABLED_KEY, True)
+            enabled = config.get(ENABLED_KEY, True)
             status = "enabled" if enabled else "disabled"
             await ctx.send(f"Event listener is {status}.")
             
         else:
-            await ctx.send("Usage: `<p>event on/off` OR `<p>event status`")
+            await ctx.send("Usage: `<p>event on/off`, `<p>event status`, `<p>event trigger ...` OR `<p>event ratelimit`")
     
     @bot.listen("on_message")
     async def message_handler(message):
@@ -62,18 +503,23 @@ def event_listener_example():
         if message.author.id == bot.user.id:
             return
             
-        # Check if the event listener is enabled
-        if not getConfigData().get(ENABLED_KEY, True):
+        # Check if the event listener is enabled (a cached lookup, no config read)
+        if not config.get(ENABLED_KEY, True):
             return
             
-        # Check if the message contains any of the keywords
-        content = message.content.lower()
-        keywords = ["hello", "hi", "hey"]
-        
-        for keyword in keywords:
-            if keyword in content:
-                # Send a response
-                await message.channel.send(f"Hello, {message.author.mention}! I noticed you said '{keyword}'.")
-                break  # Only respond once per message
+        # One pass over the message finds the first matching trigger in scope
+        found = current_engine().match(
+            message.content,
+            message.guild.id if message.guild else None,
+            message.channel.id,
+            message.author.id,
+        )
+        if found:
+            rule, matched = found
+            if not limiter.allow(message.channel.id, message.author.id, "event listener"):
+                return
+            # Only respond once per message
+            response = rule["response"].replace("{mention}", message.author.mention).replace("{match}", matched)
+            await message.channel.send(response)
 
 event_listener_example()  # Call to initialize 
\ No newline at end of file
@@ -17,21 +17,97 @@ def script_function():
     NOTES:
     - Illustrates the event logger pattern (Section 6.3)
     - Uses embed-style logging for clarity
+    - Deletions are queued and sent in batches (one embed per BATCH_SIZE
+      deletions or BATCH_SECONDS), so purging 100 messages produces a handful
+      of log messages instead of 100 sends that hit rate limits
+    - If more than MAX_QUEUE deletions are waiting, the oldest are dropped and
+      the next embed says how many were lost
     """
+    import asyncio
+    from collections import deque
+    from datetime import datetime
 
     LOG_CHANNEL_ID = 123456789012345678  # Replace with your log channel ID
 
+    BATCH_SIZE = 25  # Deletions per embed at most
+    BATCH_SECONDS = 5.0  # Send a partial batch after this long
+    MAX_QUEUE = 500  # Oldest records are dropped beyond this
+    CONTENT_LIMIT = 4000  # Embed descriptions are capped at 4096 characters
+    RECORD_LIMIT = 500  # Each deleted message's text is clipped to this
+
+    class LogBatcher:
+        """
+        Queues log records and sends them as one embed per BATCH_SIZE records
+        or every BATCH_SECONDS, whichever comes first. A single worker task
+        sends the batches one after another, splitting an embed at record
+        boundaries when it would exceed CONTENT_LIMIT.
+        """
+        def __init__(self, title):
+            self.title = title
+            self.queue = deque()
+            self.dropped = 0
+            self.full = asyncio.Event()
+            self.task = None
+
+        def add(self, record):
+            if len(self.queue) >= MAX_QUEUE:
+                self.queue.popleft()
+                self.dropped += 1
+            self.queue.append(record)
+            if len(self.queue) >= BATCH_SIZE:
+                self.full.set()
+            if self.task is None or self.task.done():
+                self.task = asyncio.create_task(self.run())
+
+        async def run(self):
+            while self.queue:
+                if len(self.queue) < BATCH_SIZE:
+                    try:
+                        await asyncio.wait_for(self.full.wait(), BATCH_SECONDS)
+                    except asyncio.TimeoutError:
+                        pass
+                self.full.clear()
+                batch = [self.queue.popleft() for _ in range(min(BATCH_SIZE, len(self.queue)))]
+                if self.dropped:
+                    batch.append(f"*{self.dropped} older deletions were dropped (queue full)*")
+                    self.dropped = 0
+                for content in self.split(batch):
+                    try:
+                        await forwardEmbedMethod(
+                            channel_id=LOG_CHANNEL_ID,
+                            content=content,
+                            title=self.title
+                        )
+                    except Exception as e:
+                        print(f"Failed to log message: {e}", type_="ERROR")
+
+        def split(self, records):
+            """Join records into chunks that fit in one embed"""
+            chunk = ""
+            for record in records:
+                if chunk and len(chunk) + len(record) + 2 > CONTENT_LIMIT:
+                    yield chunk
+                    chunk = ""
+                chunk = f"{chunk}\n\n{record}" if chunk else record
+            if chunk:
+                yield chunk
+
+    batcher = LogBatcher("Messages deleted")
+
+    def format_deletion(message):
+        content = message.content or "*(no text content)*"
+        if len(content) > RECORD_LIMIT:
+            content = content[:RECORD_LIMIT] + "…"
+        return (f"**{message.author}** in {message.channel} "
+                f"({datetime.now().strftime('%H:%M:%S')})\n{content}")
+
     @bot.listen("on_message_delete")
     async def delete_logger(message):
-        try:
-            await forwardEmbedMethod(
-                channel_id=LOG_CHANNEL_ID,
-                content=(f"**Message deleted**\n"
-                         f"User: {message.author}\n"
-                         f"Channel: {message.channel}\n"
-                         f"Content: {message.content}")
-            )
-        except Exception as e:
-            print(f"Failed to log message: {e}")
+        batcher.add(format_deletion(message))
+
+    @bot.listen("on_bulk_message_delete")
+    async def bulk_delete_logger(messages):
+        for message in messages:
+            batcher.add(format_deletion(message))
 
 script_function()
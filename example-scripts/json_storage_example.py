@@ -25,6 +25,9 @@ def json_storage_example():
     NOTES:
     - Data is stored in a JSON file in the json/ directory
     - The file is created automatically if it doesn't exist
+    - For data read on every message, or lists too large to rewrite on each
+      change, see JsonStore and SqliteStore (README 4.2.1 and 4.2.2, both used
+      in data_manager_template.py)
     """
     
     import json
@@ -1,8 +1,8 @@
 @nightyScript(
     name="Mass Unban",
     author="AutoGPT",
-    description="Unban all users in the server with a delay between each unban.",
-    usage="<p>massunban"
+    description="Unban all users in the server, pacing itself to Discord's rate limits.",
+    usage="<p>massunban [resume/restart/stop/status]"
 )
 def mass_unban_script():
     """
@@ -12,62 +12,326 @@ def mass_unban_script():
     Unban every banned user in the current Discord server.
 
     COMMANDS:
-    <p>massunban - Unban all users with a 0.7 second delay between actions
+    <p>massunban - Unban all users in this server
+    <p>massunban resume - Continue an interrupted run from its checkpoint
+    <p>massunban restart - Discard the checkpoint and start over
+    <p>massunban stop - Stop the running job (the checkpoint is kept)
+    <p>massunban status - Show progress of the running job or the checkpoint
 
     EXAMPLES:
     <p>massunban - Remove all bans from the server the command is used in
+    <p>massunban resume - Pick up where the last run stopped
 
     NOTES:
     - Requires the `ban_members` permission in the server.
-    - Uses `ctx.guild.bans()` to fetch the ban list.
-    - Implements rate limiting with `asyncio.sleep(0.7)` between unbans.
+    - Bans are paged lazily from `ctx.guild.bans()` (ordered by user ID) while
+      a few workers unban through one rate limiter shared by the job. It waits
+      out retry-after responses and slows down, then speeds up again while
+      unbans go through.
+    - Progress is checkpointed to json/mass_unban_checkpoint.json, so an
+      interrupted run (stop, crash, restart) can be resumed.
+    - The status message is updated every PROGRESS_INTERVAL seconds instead
+      of logging every user; failures are counted and the first few listed.
     """
 
     import asyncio
+    import json
+    import os
+    import threading
+    import time
+    from collections import OrderedDict
+    from datetime import datetime
+    from pathlib import Path
+
+    BASE_DIR = Path(getScriptsPath()) / "json"
+    CHECKPOINT_FILE = BASE_DIR / "mass_unban_checkpoint.json"
+    BASE_DIR.mkdir(parents=True, exist_ok=True)
+
+    WORKERS = 3  # Unbans in flight at once
+    QUEUE_SIZE = 100  # Bans paged ahead of the workers at most
+    PROGRESS_INTERVAL = 10.0  # Seconds between status edits
+    CHECKPOINT_EVERY = 25  # Unbans between checkpoint writes
+    MAX_ATTEMPTS = 3  # Tries per user when rate limited
+    MAX_LISTED_ERRORS = 5
+
+    jobs = {}  # guild id -> running UnbanJob
+    checkpoint_lock = threading.Lock()  # Checkpoint writes run in worker threads
+
+    class RateLimiter:
+        """
+        Spaces requests `interval` seconds apart across all workers. A
+        retry-after response pauses everyone for that long and widens the
+        interval; each quick success narrows it again. The same pacing as
+        cleaner.py's AdaptivePacer, but handing out slots to WORKERS
+        concurrent callers instead of sleeping between sequential deletes.
+        Each job has its own: Discord's unban bucket is per guild, so one
+        guild's rate limits say nothing about another's.
+        """
+        def __init__(self, interval=0.5, min_interval=0.1, max_interval=10.0, slow_call=1.0):
+            self.interval = interval
+            self.min_interval = min_interval
+            self.max_interval = max_interval
+            self.slow_call = slow_call
+            self.next_slot = 0.0
+            self.rate_limits = 0
+
+        async def acquire(self):
+            now = time.monotonic()
+            slot = max(now, self.next_slot)
+            self.next_slot = slot + self.interval
+            if slot > now:
+                await asyncio.sleep(slot - now)
+
+        def success(self, elapsed):
+            if elapsed >= self.slow_call:
+                # The library held the request back to wait out a rate limit
+                self.rate_limits += 1
+                self.interval = min(self.max_interval, self.interval * 2)
+            else:
+                self.interval = max(self.min_interval, self.interval * 0.9)
+
+        def rate_limited(self, retry_after):
+            self.rate_limits += 1
+            # retry_after / WORKERS: every worker gets a slot within one retry-after window
+            self.interval = min(self.max_interval, max(self.interval * 2, retry_after / WORKERS))
+            self.next_slot = max(self.next_slot, time.monotonic() + retry_after)
+
+    async def run_in_thread(func, *args, **kwargs):
+        """Run a blocking function (here, checkpoint writes) off the event loop"""
+        loop = asyncio.get_event_loop()
+        return await loop.run_in_executor(None, lambda: func(*args, **kwargs))
+
+    def load_checkpoints():
+        try:
+            with open(CHECKPOINT_FILE, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+    def save_checkpoint(guild_id, checkpoint):
+        """Store (or with None, remove) a guild's checkpoint; written atomically"""
+        with checkpoint_lock:
+            checkpoints = load_checkpoints()
+            if checkpoint is None:
+                checkpoints.pop(str(guild_id), None)
+            else:
+                checkpoints[str(guild_id)] = checkpoint
+            tmp_path = CHECKPOINT_FILE.with_suffix(".json.tmp")
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(checkpoints, f, indent=4)
+            os.replace(tmp_path, CHECKPOINT_FILE)
+
+    class UnbanJob:
+        """
+        One mass unban. A pager feeds bans into a bounded queue and WORKERS
+        tasks unban them. The checkpoint cursor is the highest user ID below
+        which every ban has been handled, so a resumed job pages from there.
+        """
+        def __init__(self, ctx, checkpoint=None):
+            checkpoint = checkpoint or {}
+            self.ctx = ctx
+            self.guild = ctx.guild
+            self.status_msg = None
+            self.task = None
+            self.limiter = RateLimiter()
+            self.queue = asyncio.Queue(maxsize=QUEUE_SIZE)
+            self.cursor = self.start_cursor = checkpoint.get("cursor", 0)
+            self.counts = {key: checkpoint.get(key, 0) for key in ("unbanned", "skipped", "failed")}
+            self.errors = []
+            self.in_flight = OrderedDict()  # user id -> done, in ban order
+            self.started = time.monotonic()
+            self.started_at = checkpoint.get("started_at") or datetime.now().isoformat(timespec="seconds")
+            self.session_done = 0
+            self.since_checkpoint = 0
+            self.last_report = self.started
+
+        async def page_bans(self):
+            """Queue ban entries after the cursor, fetching pages only as the workers need them"""
+            after = discord.Object(id=self.cursor) if self.cursor else None
+            try:
+                bans = self.guild.bans(limit=None, after=after) if after else self.guild.bans(limit=None)
+            except TypeError:
+                bans = self.guild.bans()  # Older libraries take no paging arguments
+            if hasattr(bans, "__aiter__"):
+                async for entry in bans:
+                    self.in_flight[entry.user.id] = False
+                    await self.queue.put(entry)
+            else:
+                # Older libraries return the whole list at once, in no set
+                # order; sort it so the cursor still means "all IDs below done"
+                for entry in sorted(await bans, key=lambda entry: entry.user.id):
+                    if entry.user.id > self.cursor:
+                        self.in_flight[entry.user.id] = False
+                        await self.queue.put(entry)
+
+        async def unban(self, user):
+            for attempt in range(MAX_ATTEMPTS):
+                await self.limiter.acquire()
+                started = time.monotonic()
+                try:
+                    await self.guild.unban(user)
+                except Exception as e:
+                    # The library waits out most rate limits itself; only a
+                    # 429 it gave up on reaches here
+                    if getattr(e, "status", None) == 429 or getattr(e, "retry_after", None) is not None:
+                        self.limiter.rate_limited(float(getattr(e, "retry_after", None) or 1.0))
+                        continue
+                    if getattr(e, "status", None) == 404:  # Already unbanned
+                        self.counts["skipped"] += 1
+                        return
+                    self.fail(user, e)
+                    return
+                self.limiter.success(time.monotonic() - started)
+                self.counts["unbanned"] += 1
+                return
+            self.fail(user, "still rate limited after retries")
+
+        def fail(self, user, error):
+            self.counts["failed"] += 1
+            print(f"Failed to unban {user} ({user.id}): {error}", type_="ERROR")
+            if len(self.errors) < MAX_LISTED_ERRORS:
+                self.errors.append(f"{user}: {error}")
+
+        async def worker(self):
+            while True:
+                entry = await self.queue.get()
+                if entry is None:
+                    return
+                # unban() handles its own errors; a cancelled unban is left
+                # out of complete() so the cursor never passes it
+                await self.unban(entry.user)
+                self.complete(entry.user.id)
+                if self.since_checkpoint >= CHECKPOINT_EVERY:
+                    await self.checkpoint()
+                await self.report()
+
+        def complete(self, user_id):
+            self.in_flight[user_id] = True
+            # Advance the cursor over the finished prefix only
+            while self.in_flight and next(iter(self.in_flight.values())):
+                self.cursor, _ = self.in_flight.popitem(last=False)
+            self.session_done += 1
+            self.since_checkpoint += 1
+
+        def progressed(self):
+            """Whether this session handled any ban; before that, a checkpoint would only block a fresh start"""
+            return self.session_done > 0 or self.cursor != self.start_cursor
+
+        async def checkpoint(self):
+            self.since_checkpoint = 0
+            try:
+                await run_in_thread(save_checkpoint, self.guild.id, {"cursor": self.cursor, "started_at": self.started_at, **self.counts})
+            except OSError as e:
+                print(f"Could not save unban checkpoint: {e}", type_="ERROR")
+
+        def summary(self):
+            elapsed = max(time.monotonic() - self.started, 0.001)
+            return (f"{self.counts['unbanned']} unbanned, {self.counts['skipped']} already gone, "
+                    f"{self.counts['failed']} failed ({self.session_done / elapsed:.1f}/s, "
+                    f"{self.limiter.rate_limits} rate limits)")
+
+        async def report(self, force=False):
+            now = time.monotonic()
+            if not force and now - self.last_report < PROGRESS_INTERVAL:
+                return
+            self.last_report = now
+            try:
+                await self.status_msg.edit(content=f"Unbanning in {self.guild.name}: {self.summary()}...")
+            except Exception:
+                pass
+
+        async def run(self):
+            pager = asyncio.create_task(self.page_bans())
+            workers = [asyncio.create_task(self.worker()) for _ in range(WORKERS)]
+            try:
+                await pager
+                for _ in workers:
+                    await self.queue.put(None)
+                await asyncio.gather(*workers)
+            finally:
+                pager.cancel()
+                for task in workers:
+                    task.cancel()
+            if self.session_done == 0 and not any(self.counts.values()):
+                await self.status_msg.edit(content="No banned users found.")
+            else:
+                await self.status_msg.edit(content=f"Finished in {self.guild.name}: {self.summary()}.")
+            if self.errors:
+                await self.ctx.send("Failed unbans:\n" + "\n".join(self.errors))
+            await run_in_thread(save_checkpoint, self.guild.id, None)
+
+    async def start_job(ctx, checkpoint):
+        """Run a job in the command's task, so `<p>massunban stop` can cancel it"""
+        guild = ctx.guild
+        job = UnbanJob(ctx, checkpoint)
+        job.task = asyncio.current_task()
+        jobs[guild.id] = job
+        try:
+            resumed = f" (resuming after user {checkpoint['cursor']})" if checkpoint else ""
+            job.status_msg = await ctx.send(f"Fetching bans for {guild.name}{resumed}...")
+            await job.run()
+        except asyncio.CancelledError:
+            if job.progressed():
+                await job.checkpoint()
+            resume = " Use `<p>massunban resume` to continue." if checkpoint or job.progressed() else ""
+            if job.status_msg:
+                await job.status_msg.edit(content=f"Stopped in {guild.name}: {job.summary()}.{resume}")
+        except Exception as e:
+            # Failing before any unban (e.g. Forbidden on the first page) leaves no checkpoint behind
+            if job.progressed():
+                await job.checkpoint()
+            resume = " Use `<p>massunban resume` to continue." if checkpoint or job.progressed() else ""
+            print(f"Mass unban failed in {guild.name}: {e}", type_="ERROR")
+            await ctx.send(f"Mass unban stopped by an error: {e}.{resume}")
+        finally:
+            jobs.pop(guild.id, None)
 
     @bot.command(name="massunban", description="Unban every user in the server")
-    async def mass_unban_cmd(ctx):
+    async def mass_unban_cmd(ctx, *, args: str = ""):
         await ctx.message.delete()
         guild = ctx.guild
         if guild is None:
             await ctx.send("This command can only be used in a server.")
             return
 
-        status = await ctx.send(f"Fetching bans for {guild.name}...")
-        try:
-            bans = await guild.bans()
-        except Exception as e:
-            await status.edit(content=f"Failed to fetch bans: {e}")
+        action = args.strip().lower()
+        job = jobs.get(guild.id)
+        checkpoint = load_checkpoints().get(str(guild.id))
+
+        if action == "stop":
+            if job:
+                job.task.cancel()
+            else:
+                await ctx.send("No mass unban is running in this server.")
             return
 
-        if not bans:
-            await status.edit(content="No banned users found.")
+        if action == "status":
+            if job:
+                await ctx.send(f"Running: {job.summary()}")
+            elif checkpoint:
+                await ctx.send(f"Interrupted run from {checkpoint['started_at']}: {checkpoint['unbanned']} unbanned so far. Use `<p>massunban resume` to continue.")
+            else:
+                await ctx.send("No mass unban running or interrupted in this server.")
             return
 
-        await status.edit(content=f"Unbanning {len(bans)} user(s)...")
+        if job:
+            await ctx.send("A mass unban is already running here. Use `<p>massunban stop` to stop it.")
+            return
 
-        unbanned = 0
-        for ban_entry in bans:
-            user = ban_entry.user
-            try:
-                print(
-                    f"Attempting to unban {user.name}#{user.discriminator} ({user.id})",
-                    type_="INFO",
-                )
-                await guild.unban(user)
-                unbanned += 1
-                print(
-                    f"Successfully unbanned {user.name}#{user.discriminator} ({user.id})",
-                    type_="SUCCESS",
-                )
-                await asyncio.sleep(0.7)
-            except Exception as e:
-                print(
-                    f"Failed to unban {user.name}#{user.discriminator} ({user.id}): {e}",
-                    type_="ERROR",
-                )
-                await ctx.send(f"Failed to unban {user}: {e}")
-
-        await status.edit(content=f"Unbanned {unbanned} user(s) from {guild.name}.")
+        if action == "resume":
+            if not checkpoint:
+                await ctx.send("Nothing to resume; use `<p>massunban` to start.")
+                return
+        elif action == "restart":
+            await run_in_thread(save_checkpoint, guild.id, None)
+            checkpoint = None
+        elif action:
+            await ctx.send("Usage: `<p>massunban [resume/restart/stop/status]`")
+            return
+        elif checkpoint:
+            await ctx.send("An interrupted run exists for this server. Use `<p>massunban resume` to continue it or `<p>massunban restart` to start over.")
+            return
+
+        await start_job(ctx, checkpoint)
 
 mass_unban_script()
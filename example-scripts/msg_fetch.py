@@ -2,7 +2,7 @@
     name="Message Range Fetcher",
     author="thedorekaczynski",
     description="Fetches all messages between two given message IDs in a channel.",
-    usage="<p>between <message_id_start> <message_id_end>"
+    usage="<p>between <message_id_start> <message_id_end> [--limit <n> | --all] [--export jsonl/txt/html] OR <p>archive sync/search/status"
 )
 def message_range_script():
     """
@@ -13,35 +13,427 @@ def message_range_script():
     
     COMMANDS:
     <p>between <start_id> <end_id> - Fetch messages between two message IDs
+    <p>between <start_id> <end_id> --limit <n> - Fetch at most <n> messages
+    <p>between <start_id> <end_id> --all - Fetch the whole range, however large
+    <p>between <start_id> <end_id> --export <jsonl/txt/html> [--attachments] - Upload the range as one file
+    <p>archive sync [n|--all] - Archive this channel (first sync: newest n messages, default 1000)
+    <p>archive search <words> [--everywhere] - Search archived messages in this channel (or all channels)
+    <p>archive status - Show what is archived
     
     EXAMPLES:
     <p>between 112233445566778899 998877665544332211 - Fetch all messages between the two given message IDs
+    <p>between 112233445566778899 998877665544332211 --limit 2000 - Allow a larger range
+    <p>between 112233445566778899 998877665544332211 --export html --attachments - One HTML file with attachment links
+    <p>archive sync --all - Archive the whole channel once; later syncs only fetch new messages
+    <p>archive search release notes - Find archived messages containing both words
     
     NOTES:
     - Both message IDs must be from the same channel.
     - The script fetches messages in chronological order.
     - Will include the messages at both endpoints.
+    - Pages are sent while the range is still being fetched, and only a few
+      pages are kept in memory, so large ranges start printing right away.
+    - Pages break between lines, so a message is only split when it is longer
+      than a page by itself.
+    - Without --limit or --all at most 500 messages are fetched; the reply
+      says how to continue from where it stopped.
+    - Messages are kept in json/message_archive.db (SQLite, full-text indexed
+      with FTS5). New, edited and deleted messages in archived channels are
+      recorded as they happen (raw gateway events, so older uncached messages
+      count too). Once a channel has been synced since the script loaded,
+      `between` reads ranges inside the archive locally after fetching only
+      messages newer than the last sync; other ranges are fetched from
+      Discord (and archived for search).
+    - Messages, edits and deletions made while the script was not running,
+      or while the gateway was disconnected, are not in the archive. A
+      disconnect therefore ends local reads for every channel, as a restart
+      does. Run `<p>archive sync` again to trust it for local reads;
+      search results and local reads of older messages may still show their
+      archived (possibly since edited or deleted) content.
+    - Exports are written to exports/ in a worker thread while the range is
+      fetched and uploaded as a single attachment (gzipped if larger than
+      UPLOAD_LIMIT); they stop after 20000 messages unless --limit/--all is
+      given. The file is deleted once uploaded; one still over UPLOAD_LIMIT
+      after gzip is kept in exports/ and its path reported instead. --attachments adds attachment and embed URLs, which are not
+      archived, so those exports always fetch from Discord.
     """
     
     import asyncio
+    import atexit
+    import gzip
+    import html
+    import json
+    import shutil
+    import sqlite3
+    from concurrent.futures import ThreadPoolExecutor
+    from pathlib import Path
+
+    ARCHIVE_PATH = Path(getScriptsPath()) / "json" / "message_archive.db"
+    ARCHIVE_PATH.parent.mkdir(parents=True, exist_ok=True)
+    EXPORT_DIR = Path(getScriptsPath()) / "exports"
+
+    PAGE_SIZE = 1900  # Discord messages are capped at 2000 characters
+    DEFAULT_LIMIT = 500  # Messages fetched unless --limit or --all is given
+    PAGE_QUEUE = 3  # Pages formatted ahead of the sender at most
+    SYNC_DEFAULT = 1000  # Messages taken by the first sync of a channel
+    SYNC_BATCH = 100  # Rows written (and read back) per statement
+    SEARCH_LIMIT = 25  # Search results shown
+    EXPORT_FORMATS = ("jsonl", "txt", "html")
+    EXPORT_LIMIT = 20000  # Messages exported unless --limit or --all is given
+    EXPORT_BATCH = 200  # Records written to the file per worker call
+    UPLOAD_LIMIT = 10 * 1024 * 1024  # Bytes; larger exports are gzipped
+
+    HTML_HEAD = """<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>{title}</title>
+<style>
+body {{ font-family: sans-serif; background: #313338; color: #dbdee1; }}
+.msg {{ margin: 6px 0; }}
+.author {{ font-weight: bold; color: #f2f3f5; }}
+.time {{ color: #949ba4; font-size: 0.8em; margin-left: 6px; }}
+.content {{ white-space: pre-wrap; }}
+a {{ color: #00a8fc; }}
+</style></head><body><h2>{title}</h2>
+"""
+    HTML_FOOT = "</body></html>\n"
+
+    def message_row(msg):
+        """Archive row for a message: (id, channel_id, author_id, author, created_at, content)"""
+        return (
+            msg.id,
+            msg.channel.id,
+            msg.author.id,
+            f"{msg.author.name}#{msg.author.discriminator}",
+            msg.created_at.strftime("%Y-%m-%d %H:%M:%S"),
+            msg.content or "",
+        )
+
+    def format_row(row):
+        author, timestamp, content = row[3], row[4], row[5] or "[No Text]"
+        return f"**{author}** ({timestamp}): {content}"
+
+    class MessageArchive:
+        """
+        Local message archive in SQLite with an FTS5 index over the content.
+        `coverage` holds, per channel, the (low, high) message ID range known
+        to be complete: ranges inside it are read locally, and a sync only asks
+        Discord for messages newer than its high-water mark. A worker thread
+        owns the connection, as in SqliteStore (README 4.2.2).
+        """
+        def __init__(self, path):
+            self.path = Path(path)
+            self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="message-archive")
+            self.conn = None
+            self.fts = True
+            self.coverage = {}  # channel id -> (low, high)
+            self.live = set()  # Channels synced since the last connect; new messages extend their coverage
+            self.executor.submit(self.connect).result()
+
+        def connect(self):
+            # Only the worker thread uses the connection; close() runs after it has stopped
+            self.conn = sqlite3.connect(self.path, check_same_thread=False)
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.execute("PRAGMA synchronous=NORMAL")
+            self.conn.executescript("""
+                CREATE TABLE IF NOT EXISTS messages (
+                    id INTEGER PRIMARY KEY,
+                    channel_id INTEGER NOT NULL,
+                    author_id INTEGER NOT NULL,
+                    author TEXT NOT NULL,
+                    created_at TEXT NOT NULL,
+                    content TEXT NOT NULL,
+                    deleted INTEGER NOT NULL DEFAULT 0
+                );
+                CREATE INDEX IF NOT EXISTS messages_by_channel ON messages (channel_id, id);
+                CREATE TABLE IF NOT EXISTS coverage (channel_id INTEGER PRIMARY KEY, low INTEGER NOT NULL, high INTEGER NOT NULL);
+            """)
+            try:
+                # External-content index kept in step with the messages table by triggers
+                self.conn.executescript("""
+                    CREATE VIRTUAL TABLE IF NOT EXISTS messages_fts USING fts5(content, content='messages', content_rowid='id');
+                    CREATE TRIGGER IF NOT EXISTS messages_ai AFTER INSERT ON messages BEGIN
+                        INSERT INTO messages_fts (rowid, content) VALUES (new.id, new.content);
+                    END;
+                    CREATE TRIGGER IF NOT EXISTS messages_ad AFTER DELETE ON messages BEGIN
+                        INSERT INTO messages_fts (messages_fts, rowid, content) VALUES ('delete', old.id, old.content);
+                    END;
+                    CREATE TRIGGER IF NOT EXISTS messages_au AFTER UPDATE OF content ON messages BEGIN
+                        INSERT INTO messages_fts (messages_fts, rowid, content) VALUES ('delete', old.id, old.content);
+                        INSERT INTO messages_fts (rowid, content) VALUES (new.id, new.content);
+                    END;
+                """)
+            except sqlite3.OperationalError:
+                self.fts = False  # SQLite built without FTS5: search falls back to LIKE
+            self.conn.commit()
+            self.coverage = {channel: (low, high) for channel, low, high in self.conn.execute("SELECT channel_id, low, high FROM coverage")}
+
+        def execute(self, sql, params=(), fetch=None, many=False):
+            """Run one parameterized statement in a transaction (worker thread only)"""
+            with self.conn:
+                if many:
+                    return self.conn.executemany(sql, params).rowcount
+                cursor = self.conn.execute(sql, params)
+                if fetch == "all":
+                    return cursor.fetchall()
+                return cursor.rowcount
+
+        async def query(self, sql, params=(), fetch=None, many=False):
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self.executor, self.execute, sql, params, fetch, many)
+
+        async def store(self, rows):
+            """Insert or refresh message rows (see message_row)"""
+            if rows:
+                await self.query(
+                    "INSERT INTO messages (id, channel_id, author_id, author, created_at, content) VALUES (?, ?, ?, ?, ?, ?) "
+                    "ON CONFLICT (id) DO UPDATE SET content = excluded.content, deleted = 0",
+                    rows, many=True,
+                )
+
+        async def set_coverage(self, channel_id, low, high):
+            self.coverage[channel_id] = (low, high)
+            await self.query("INSERT OR REPLACE INTO coverage (channel_id, low, high) VALUES (?, ?, ?)", (channel_id, low, high))
+
+        def covers(self, channel_id, start_id):
+            """
+            True if everything in the channel from start_id on is archived and
+            the channel was synced since the gateway last connected, so new
+            messages, edits and deletions since then have been recorded
+            """
+            coverage = self.coverage.get(channel_id)
+            return channel_id in self.live and coverage is not None and coverage[0] <= start_id
+
+        async def sync(self, channel, initial=SYNC_DEFAULT):
+            """
+            Archive messages newer than the channel's high-water mark. The first
+            sync takes the newest `initial` messages (None: the whole channel).
+            Returns the number of messages fetched.
+            """
+            coverage = self.coverage.get(channel.id)
+            if coverage:
+                history = channel.history(limit=None, after=discord.Object(id=coverage[1]), oldest_first=True)
+            else:
+                history = channel.history(limit=initial)
+            low, high = coverage or (None, 0)
+            rows, fetched = [], 0
+            async for message in history:
+                rows.append(message_row(message))
+                fetched += 1
+                low = message.id if low is None else min(low, message.id)
+                high = max(high, message.id)
+                if len(rows) >= SYNC_BATCH:
+                    await self.store(rows)
+                    rows = []
+            await self.store(rows)
+            if not coverage and (initial is None or fetched < initial):
+                low = 0  # Reached the start of the channel
+            await self.set_coverage(channel.id, low if low is not None else 0, high)
+            self.live.add(channel.id)
+            return fetched
+
+        async def iter_range(self, channel_id, start_id, end_id):
+            """Yield archived rows from start_id to end_id (inclusive), oldest first, a batch at a time"""
+            while True:
+                rows = await self.query(
+                    "SELECT id, channel_id, author_id, author, created_at, content FROM messages "
+                    "WHERE channel_id = ? AND id >= ? AND id <= ? AND deleted = 0 ORDER BY id LIMIT ?",
+                    (channel_id, start_id, end_id, SYNC_BATCH), "all",
+                )
+                for row in rows:
+                    yield row
+                if len(rows) < SYNC_BATCH:
+                    return
+                start_id = rows[-1][0] + 1
+
+        async def search(self, terms, channel_id=None, limit=SEARCH_LIMIT):
+            """Newest archived messages containing every term"""
+            words = terms.split()
+            scope, params = ("AND m.channel_id = ?", [channel_id]) if channel_id else ("", [])
+            if self.fts:
+                match = " ".join('"' + word.replace('"', '""') + '"' for word in words)
+                sql = ("SELECT m.id, m.channel_id, m.author_id, m.author, m.created_at, m.content FROM messages_fts "
+                       f"JOIN messages m ON m.id = messages_fts.rowid WHERE messages_fts MATCH ? AND m.deleted = 0 {scope} "
+                       "ORDER BY m.id DESC LIMIT ?")
+                return await self.query(sql, [match] + params + [limit], "all")
+            likes = " AND ".join("m.content LIKE ?" for _ in words)
+            sql = ("SELECT m.id, m.channel_id, m.author_id, m.author, m.created_at, m.content FROM messages m "
+                   f"WHERE {likes} AND m.deleted = 0 {scope} ORDER BY m.id DESC LIMIT ?")
+            return await self.query(sql, [f"%{word}%" for word in words] + params + [limit], "all")
+
+        async def stats(self):
+            rows = await self.query("SELECT COUNT(*), COUNT(DISTINCT channel_id) FROM messages WHERE deleted = 0", (), "all")
+            return rows[0]
+
+        def close(self):
+            """Finish queued statements, then close (checkpoints the WAL)"""
+            self.executor.shutdown(wait=True)
+            self.conn.close()
+
+    archive = MessageArchive(ARCHIVE_PATH)
+    atexit.register(archive.close)
+
+    def split_line(line):
+        """Yield pieces of a line that fit on a page, cutting at newlines where possible"""
+        while len(line) > PAGE_SIZE:
+            cut = line.rfind("\n", 0, PAGE_SIZE)
+            if cut <= 0:
+                cut = PAGE_SIZE
+            yield line[:cut]
+            line = line[cut:].lstrip("\n")
+        yield line
+
+    class PageWriter:
+        """
+        Packs lines into pages of at most PAGE_SIZE characters, breaking only
+        between lines, and hands full pages to a sender task through a small
+        queue. Fetching and sending overlap, and memory stays at a few pages.
+        """
+        def __init__(self, ctx):
+            self.ctx = ctx
+            self.lines = []
+            self.size = 0
+            self.queue = asyncio.Queue(maxsize=PAGE_QUEUE)
+            self.sender = asyncio.create_task(self.send_pages())
+
+        async def add(self, line):
+            for piece in split_line(line):
+                if self.lines and self.size + len(piece) + 1 > PAGE_SIZE:
+                    await self.flush()
+                self.lines.append(piece)
+                self.size += len(piece) + 1
+
+        async def flush(self):
+            if self.lines:
+                await self.queue.put("\n".join(self.lines))
+                self.lines, self.size = [], 0
+
+        async def close(self):
+            """Send the last page and wait until every page is out"""
+            await self.flush()
+            await self.queue.put(None)
+            await self.sender
+
+        async def send_pages(self):
+            while True:
+                page = await self.queue.get()
+                if page is None:
+                    return
+                try:
+                    await self.ctx.send(page)
+                except Exception as e:
+                    print(f"Error sending page: {str(e)}", type_="ERROR")
+
+    def attachment_urls(msg):
+        """URLs of a message's attachments and embeds"""
+        urls = [attachment.url for attachment in msg.attachments]
+        for embed in msg.embeds:
+            for url in (embed.url, getattr(embed.image, "url", None), getattr(embed.thumbnail, "url", None)):
+                if url:
+                    urls.append(url)
+        return urls
+
+    class ExportWriter:
+        """
+        Streams records to a file. Rendered records are collected into batches
+        of EXPORT_BATCH and each batch is written in a worker thread, so the
+        event loop never waits on the disk and memory holds a single batch.
+        """
+        def __init__(self, path, fmt, title):
+            self.path = path
+            self.fmt = fmt
+            self.file = None
+            self.batch = [HTML_HEAD.format(title=html.escape(title))] if fmt == "html" else []
+
+        def render(self, row, urls):
+            message_id, channel_id, author_id, author, timestamp, content = row
+            if self.fmt == "jsonl":
+                record = {"id": message_id, "author_id": author_id, "author": author, "created_at": timestamp, "content": content}
+                if urls is not None:
+                    record["attachments"] = urls
+                return json.dumps(record, ensure_ascii=False) + "\n"
+            links = urls or []
+            if self.fmt == "txt":
+                return "".join([f"[{timestamp}] {author}: {content}\n"] + [f"    {url}\n" for url in links])
+            link_html = "".join(f'<br><a href="{html.escape(url)}">{html.escape(url)}</a>' for url in links)
+            return (f'<div class="msg" id="m{message_id}"><span class="author">{html.escape(author)}</span>'
+                    f'<span class="time">{timestamp}</span><div class="content">{html.escape(content)}{link_html}</div></div>\n')
+
+        async def add(self, row, urls=None):
+            self.batch.append(self.render(row, urls))
+            if len(self.batch) >= EXPORT_BATCH:
+                await self.flush()
+
+        def write(self, data):
+            if self.file is None:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                self.file = open(self.path, "w", encoding="utf-8")
+            self.file.write(data)
+
+        async def flush(self):
+            if self.batch:
+                data, self.batch = "".join(self.batch), []
+                await asyncio.get_running_loop().run_in_executor(None, self.write, data)
+
+        def finish(self):
+            """Close the file and gzip it if it is too big to upload; returns the path to send"""
+            if self.file is None:
+                self.write("")
+            self.file.close()
+            if self.path.stat().st_size <= UPLOAD_LIMIT:
+                return self.path
+            gz_path = self.path.with_name(self.path.name + ".gz")
+            with open(self.path, "rb") as source, gzip.open(gz_path, "wb") as target:
+                shutil.copyfileobj(source, target)
+            self.path.unlink()
+            return gz_path
+
+        async def close(self):
+            if self.fmt == "html":
+                self.batch.append(HTML_FOOT)
+            await self.flush()
+            return await asyncio.get_running_loop().run_in_executor(None, self.finish)
+
+    def parse_between_args(args):
+        """Return (start_id, end_id, limit, export format, include URLs); raises ValueError with a message for the user"""
+        ids, limit, limit_given, export, with_urls = [], DEFAULT_LIMIT, False, None, False
+        tokens = iter(args.strip().split())
+        for token in tokens:
+            if token == "--all":
+                limit, limit_given = None, True
+            elif token == "--limit":
+                value = next(tokens, "")
+                if not value.isdigit() or int(value) < 1:
+                    raise ValueError("`--limit` needs a positive number.")
+                limit, limit_given = int(value), True
+            elif token == "--export":
+                export = next(tokens, "").lower()
+                if export not in EXPORT_FORMATS:
+                    raise ValueError("`--export` needs one of: jsonl, txt, html.")
+            elif token == "--attachments":
+                with_urls = True
+            else:
+                try:
+                    ids.append(int(token))
+                except ValueError:
+                    raise ValueError("Both IDs must be valid integers.")
+        if len(ids) != 2:
+            raise ValueError("Usage: `<p>between <start_id> <end_id> [--limit <n> | --all] [--export jsonl/txt/html] [--attachments]`")
+        if with_urls and not export:
+            raise ValueError("`--attachments` only applies to `--export`.")
+        if export and not limit_given:
+            limit = EXPORT_LIMIT
+        return ids[0], ids[1], limit, export, with_urls
 
     @bot.command(
         name="between",
-        usage="<start_id> <end_id>",
+        usage="<start_id> <end_id> [--limit <n> | --all] [--export jsonl/txt/html] [--attachments]",
         description="Fetch messages between two message IDs"
     )
     async def fetch_between(ctx, *, args: str):
         await ctx.message.delete()
-        parts = args.strip().split()
-        if len(parts) != 2:
-            await ctx.send("Usage: `<p>between <start_id> <end_id>`")
-            return
-        
         try:
-            start_id = int(parts[0])
-            end_id = int(parts[1])
-        except ValueError:
-            await ctx.send("Both IDs must be valid integers.")
+            start_id, end_id, limit, export, with_urls = parse_between_args(args)
+        except ValueError as e:
+            await ctx.send(str(e))
             return
 
         if start_id == end_id:
@@ -52,30 +444,186 @@ def message_range_script():
             start_id, end_id = end_id, start_id  # Ensure chronological order
 
         channel = ctx.channel
-        all_messages = []
+        status_msg = None
+        if export:
+            status_msg = await ctx.send(f"📄 Exporting messages to {export}...")
+            writer = ExportWriter(EXPORT_DIR / f"messages_{channel.id}_{start_id}_{end_id}.{export}", export, f"#{getattr(channel, 'name', channel.id)}: {start_id} to {end_id}")
+        else:
+            writer = PageWriter(ctx)
+        count = 0
+        last_id = None
+        capped = False
+        # The archive has no attachment URLs, so --attachments always reads from Discord
+        local = archive.covers(channel.id, start_id) and not with_urls
+        rows = []
 
         try:
-            async for message in channel.history(limit=None, after=discord.Object(id=start_id-1), before=discord.Object(id=end_id+1), oldest_first=True):
-                all_messages.append(message)
+            if local:
+                # Bring the archive up to date, then read the range without paging Discord
+                await archive.sync(channel)
+                source = archive.iter_range(channel.id, start_id, end_id)
+            else:
+                # One extra message tells us whether the range goes on past the limit
+                source = channel.history(limit=limit + 1 if limit else None, after=discord.Object(id=start_id-1), before=discord.Object(id=end_id+1), oldest_first=True)
+            async for item in source:
+                if limit and count >= limit:
+                    capped = True
+                    break
+                row = item if local else message_row(item)
+                if export:
+                    await writer.add(row, attachment_urls(item) if with_urls else None)
+                else:
+                    await writer.add(format_row(row))
+                count += 1
+                last_id = row[0]
+                if not local:
+                    rows.append(row)
+                    if len(rows) >= SYNC_BATCH:
+                        await archive.store(rows)
+                        rows = []
+            await archive.store(rows)
         except Exception as e:
+            try:
+                path = await writer.close()
+                if export:
+                    path.unlink(missing_ok=True)  # Drop the partial export
+            except Exception:
+                pass
+            if status_msg:
+                try:
+                    await status_msg.delete()
+                except:
+                    pass
             await ctx.send(f"Error fetching messages: {str(e)}")
             return
 
-        if not all_messages:
+        path = await writer.close()
+        more = f" Stopped after {limit} messages; continue with `<p>between {last_id + 1} {end_id}`, or add `--all` to fetch the whole range." if capped else ""
+
+        if export:
+            try:
+                size = path.stat().st_size
+                if not count:
+                    path.unlink()
+                    await ctx.send("No messages found in the given range.")
+                elif size > UPLOAD_LIMIT:
+                    # Even gzipped it is too big to attach; leave it on disk
+                    await ctx.send(f"📄 Exported {count} messages, but the file is {size / 1024 / 1024:.1f} MB "
+                                   f"after compression, over the upload limit. Saved as {path}.{more}")
+                else:
+                    await ctx.send(f"📄 Exported {count} messages.{more}", file=discord.File(str(path), filename=path.name))
+                    try:
+                        path.unlink()  # Uploaded; don't let exports/ grow
+                    except OSError:
+                        pass
+            except Exception as e:
+                await ctx.send(f"Error uploading export (saved as {path}): {str(e)}")
+            try:
+                await status_msg.delete()
+            except:
+                pass
+            return
+
+        if not count:
             await ctx.send("No messages found in the given range.")
+        elif capped:
+            await ctx.send(more.strip())
+
+    @bot.command(
+        name="archive",
+        usage="sync [n|--all] OR search <words> [--everywhere] OR status",
+        description="Archive and search channel history locally"
+    )
+    async def archive_command(ctx, *, args: str = ""):
+        await ctx.message.delete()
+        parts = args.strip().split(maxsplit=1)
+        subcommand = parts[0].lower() if parts else ""
+        subargs = parts[1].strip() if len(parts) > 1 else ""
+        channel = ctx.channel
+
+        if subcommand == "sync":
+            initial = SYNC_DEFAULT
+            if subargs == "--all":
+                initial = None
+            elif subargs.isdigit() and int(subargs) > 0:
+                initial = int(subargs)
+            elif subargs:
+                await ctx.send("Usage: `<p>archive sync [n|--all]`")
+                return
+            status_msg = await ctx.send("🗄️ Syncing archive...")
+            try:
+                fetched = await archive.sync(channel, initial)
+            except Exception as e:
+                await status_msg.edit(content=f"Error syncing archive: {str(e)}")
+                return
+            low, high = archive.coverage[channel.id]
+            since = "the start of the channel" if low == 0 else f"message {low}"
+            await status_msg.edit(content=f"🗄️ Archived {fetched} new messages. This channel is archived from {since} onwards.")
+
+        elif subcommand == "search" and subargs:
+            everywhere = subargs.endswith("--everywhere")
+            terms = subargs[:-len("--everywhere")].strip() if everywhere else subargs
+            if not terms:
+                await ctx.send("Usage: `<p>archive search <words> [--everywhere]`")
+                return
+            results = await archive.search(terms, None if everywhere else channel.id)
+            if not results:
+                await ctx.send("No archived messages match.")
+                return
+            writer = PageWriter(ctx)
+            for row in results:
+                where = f"<#{row[1]}> " if everywhere else ""
+                await writer.add(f"{where}`{row[0]}` {format_row(row)}")
+            await writer.close()
+
+        elif subcommand == "status":
+            total, channels = await archive.stats()
+            coverage = archive.coverage.get(channel.id)
+            here = "not archived yet (use `<p>archive sync`)"
+            if coverage:
+                here = "archived from the start" if coverage[0] == 0 else f"archived from message {coverage[0]}"
+            search = "FTS5" if archive.fts else "LIKE (FTS5 unavailable)"
+            await ctx.send(f"🗄️ {total} messages archived across {channels} channels. This channel is {here}. Search: {search}.")
+
+        else:
+            await ctx.send("Usage: `<p>archive sync [n|--all]`, `<p>archive search <words> [--everywhere]` OR `<p>archive status`")
+
+    @bot.listen("on_message")
+    async def archive_new_message(message):
+        channel_id = message.channel.id
+        if channel_id not in archive.coverage:
             return
+        try:
+            await archive.store([message_row(message)])
+            if channel_id in archive.live:
+                low, high = archive.coverage[channel_id]
+                if message.id > high:
+                    await archive.set_coverage(channel_id, low, message.id)
+        except Exception as e:
+            print(f"Error archiving message: {str(e)}", type_="ERROR")
+
+    @bot.listen("on_disconnect")
+    async def archive_disconnect():
+        # Events missed while disconnected would be silently treated as
+        # archived; channels stay out of local reads until synced again
+        archive.live.clear()
 
-        content_lines = []
-        for msg in all_messages:
-            author = f"{msg.author.name}#{msg.author.discriminator}"
-            timestamp = msg.created_at.strftime("%Y-%m-%d %H:%M:%S")
-            content = msg.content or "[No Text]"
-            content_lines.append(f"**{author}** ({timestamp}): {content}")
+    # Raw events fire for every message, not only those still in the client's cache
+    @bot.listen("on_raw_message_edit")
+    async def archive_edit(payload):
+        data = getattr(payload, "data", None) or {}
+        if payload.channel_id in archive.coverage and "content" in data:
+            await archive.query("UPDATE messages SET content = ? WHERE id = ?", (data["content"] or "", payload.message_id))
 
-        content = "\n".join(content_lines)
+    @bot.listen("on_raw_message_delete")
+    async def archive_delete(payload):
+        if payload.channel_id in archive.coverage:
+            await archive.query("UPDATE messages SET deleted = 1 WHERE id = ?", (payload.message_id,))
 
-        chunks = [content[i:i+1900] for i in range(0, len(content), 1900)]
-        for chunk in chunks:
-            await ctx.send(chunk)
+    @bot.listen("on_raw_bulk_message_delete")
+    async def archive_bulk_delete(payload):
+        if payload.channel_id in archive.coverage:
+            ids = [(message_id,) for message_id in payload.message_ids]
+            await archive.query("UPDATE messages SET deleted = 1 WHERE id = ?", ids, many=True)
 
 message_range_script()
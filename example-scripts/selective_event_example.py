@@ -26,9 +26,17 @@ def selective_event_example():
     - The script ONLY responds to messages from servers and users in the allowed lists
     - If no servers or users are in the allowed list, the event listener will not respond to any messages
     - The allowed lists are stored in JSON files in the json/ directory
+    - Incoming messages are checked against in-memory integer sets (FilterIndex),
+      so the listener never parses the JSON files; edits to the files on disk
+      are picked up within a few seconds
+    - An allowed user in a busy channel could otherwise get a reply to every
+      message; each reply first asks bot.response_limiter (published by
+      event_listener_example) for a token
     """
     
     import json
+    import os
+    import time
     from pathlib import Path
     
     # Define the JSON file paths
@@ -60,6 +68,58 @@ def selective_event_example():
         with open(file_path, "w") as f:
             json.dump(id_list, f, indent=4)
     
+    class FilterIndex:
+        """
+        Allow-lists held as frozensets of integer IDs. They are rebuilt when a
+        command changes a list (call refresh()) or when a list file's mtime
+        changes, checked at most every `check_interval` seconds, so allows() is
+        a few set lookups and almost never touches the disk.
+        """
+        def __init__(self, files, empty_allows_all=True, check_interval=5.0):
+            self.files = files  # {"servers": path, "users": ..., "channels": ...}
+            self.empty_allows_all = empty_allows_all
+            self.check_interval = check_interval
+            self.mtimes = {}
+            self.sets = {}
+            self.refresh()
+
+        def mtime(self, path):
+            try:
+                return os.stat(path).st_mtime_ns
+            except FileNotFoundError:
+                return None
+
+        def refresh(self):
+            """Rebuild the sets from the files"""
+            for name, path in self.files.items():
+                self.mtimes[name] = self.mtime(path)
+                self.sets[name] = frozenset(int(i) for i in load_ids(path) if str(i).isdigit())
+            self.next_check = time.monotonic() + self.check_interval
+
+        def allows(self, guild_id=None, user_id=None, channel_id=None):
+            """True if every configured list allows its ID (None skips that check, e.g. DMs)"""
+            if time.monotonic() >= self.next_check:
+                # Picks up lists edited by hand
+                if any(self.mtime(path) != self.mtimes[name] for name, path in self.files.items()):
+                    self.refresh()
+                else:
+                    self.next_check = time.monotonic() + self.check_interval
+                    
+            for name, value in (("servers", guild_id), ("users", user_id), ("channels", channel_id)):
+                ids = self.sets.get(name)
+                if ids is None:
+                    continue
+                if not ids:
+                    if self.empty_allows_all:
+                        continue
+                    return False
+                if value is not None and value not in ids:
+                    return False
+            return True
+
+    # Both lists must be non-empty for the listener to respond
+    filters = FilterIndex({"servers": SERVERS_FILE, "users": USERS_FILE}, empty_allows_all=False)
+    
     @bot.command(name="selective", description="Manage allowed servers and users")
     async def selective_command(ctx, *, args: str):
         await ctx.message.delete()
@@ -99,6 +159,7 @@ def selective_event_example():
                 if server_id not in allowed_servers:
                     allowed_servers.append(server_id)
                     save_ids(SERVERS_FILE, allowed_servers)
+                    filters.refresh()
                     await ctx.send(f"Added server {server.name} ({server_id}) to the allowed list.")
                 else:
                     await ctx.send(f"Server {server.name} ({server_id}) is already in the allowed list.")
@@ -117,6 +178,7 @@ def selective_event_example():
                 if user_id not in allowed_users:
                     allowed_users.append(user_id)
                     save_ids(USERS_FILE, allowed_users)
+                    filters.refresh()
                     await ctx.send(f"Added user {user_id} to the allowed list.")
                 else:
                     await ctx.send(f"User {user_id} is already in the allowed list.")
@@ -133,25 +195,13 @@ def selective_event_example():
         if message.author.id == bot.user.id:
             return
             
-        # Load allowed servers and users
-        allowed_servers = load_ids(SERVERS_FILE)
-        allowed_users = load_ids(USERS_FILE)
-        
-        # Check if the message is from an allowed server or user
-        server_id = str(message.guild.id) if message.guild else None
-        user_id = str(message.author.id)
-        
         # Only respond if the message is from an allowed server AND an allowed user
         # If either list is empty, we don't respond to any messages
-        if not allowed_servers or not allowed_users:
+        if not filters.allows(message.guild.id if message.guild else None, message.author.id):
             return
-            
-        # Check if the message is from an allowed server
-        if server_id and server_id not in allowed_servers:
-            return
-            
-        # Check if the message is from an allowed user
-        if user_id not in allowed_users:
+        
+        limiter = getattr(bot, "response_limiter", None)
+        if limiter and not limiter.allow(message.channel.id, message.author.id, "selective event"):
             return
             
         # Respond to the message
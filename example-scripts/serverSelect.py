@@ -5,6 +5,9 @@
     usage="Select the server from the selection menu on the custom tab."
 )
 def serverSelect():
+    import os
+    import json
+    
     os.makedirs(f'{getScriptsPath()}/scriptData', exist_ok=True)
     script_config_path = f"{getScriptsPath()}/scriptData/serverSelect.json"
     
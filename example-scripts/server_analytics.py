@@ -2,20 +2,24 @@
     name="Server Analytics",
     author="thedorekaczynski",
     description="Discord server member tracking and analytics system with growth trends",
-    usage="""<p>analytics snapshot - Take a server snapshot
+    usage="""<p>analytics snapshot [all] - Take a server snapshot (or one of every server)
 <p>analytics report - Generate a server analytics report
 <p>analytics clear - Clear analytics data
 <p>analytics status - Show analytics collection status
 <p>analytics members - Show member count history graph
 <p>analytics trend - Show member growth trend analysis
 <p>analytics compare <days> - Compare server stats between two time periods
-<p>analytics export - Export analytics data to a text file
+<p>analytics export [days] [from:date] [to:date] [cols:a,b] [gz] - Export analytics data to a CSV file
 <p>analytics auto <on/off> - Toggle automatic daily snapshots
 <p>analytics retention [days] - Set snapshot data retention period
 <p>analytics interval [hours] - Set auto-snapshot interval
+<p>analytics storage [jsonl/binary] - Set snapshot storage format
+<p>analytics chart [image/emoji/text] - Set the member history style
+<p>analytics recount - Rebuild the bot and channel counters
+<p>analytics fleet [growth/shrinking/percent/members/stale] [7d/30d] [count] - Rank every tracked server
 <p>a <subcommand> - Shorthand for analytics command (same functionality)
-<p>a ss - Short command for taking a snapshot
-<p>a timezone <zone> - Set your preferred timezone (EST, PST, etc.)"""
+<p>a ss [all] - Short command for taking a snapshot
+<p>a timezone <zone> - Set your preferred timezone (EST, Europe/Berlin, etc.)"""
 )
 def server_analytics():
     """
@@ -39,6 +43,8 @@ def server_analytics():
     COMMANDS:
     <p>analytics snapshot     - Take an immediate snapshot
                              Shows members, channels, and timestamp
+    <p>analytics snapshot all - Snapshot every server concurrently
+                             Reports throughput and the slowest servers
     <p>analytics report      - Generate detailed analytics report
                              Includes member stats, channels, roles, and growth
     <p>analytics clear      - Clear analytics data
@@ -46,19 +52,28 @@ def server_analytics():
     <p>analytics status     - Show analytics collection status
                              Displays snapshot count and latest data
     <p>analytics members    - Show member count history graph
-                             Displays last 5 snapshots with trends and timestamps
+                             Renders a PNG chart of the full history (image style)
+                             or lists the last 7 snapshots (emoji/text styles)
     <p>analytics trend      - Show member growth trend analysis
                              Analyzes growth patterns and shows predictions
     <p>analytics compare <days> - Compare server stats between two time periods
                              Default compares current with 7 days ago
-    <p>analytics export     - Export analytics data to a text file
+    <p>analytics export     - Export analytics data to a CSV file
                              Creates a downloadable record of your data
+                             Options: [days] or from:YYYY-MM-DD to:YYYY-MM-DD,
+                             cols:member_count,bots,... and gz for gzip output
     <p>analytics auto <on/off> - Toggle automatic daily snapshots
                              Enables or disables automatic data collection
     <p>analytics retention [days] - Set how long snapshot data is kept (in days)
     <p>analytics interval [hours] - Set the interval for automatic snapshots
+    <p>analytics storage [jsonl/binary] - Set the snapshot storage format
+    <p>analytics chart [image/emoji/text] - Set how `members` shows history
+    <p>analytics recount    - Rebuild the bot and channel-type counters from scratch
+    <p>analytics fleet      - Rank every tracked server (default: top 10 by 7-day growth)
+                             Sorts: growth, shrinking, percent, members, stale;
+                             windows: 7d, 30d; `fleet rebuild` re-indexes all servers
     <p>a ss                 - Short command for taking a snapshot
-    <p>a timezone <zone>    - Set your preferred timezone (EST, PST, etc.)
+    <p>a timezone <zone>    - Set your preferred timezone (EST, Europe/Berlin, etc.)
     
     EXAMPLE OUTPUTS:
     Snapshot: 
@@ -86,14 +101,49 @@ def server_analytics():
     DATA STORAGE:
     - Base Directory: /json/server_member_tracking/<server_id>/
     - Files per server:
-      • member_snapshots.json - Server member snapshots and metrics
+      • member_snapshots.jsonl - Append-only snapshot log (one JSON record per line)
+      • member_rollups.jsonl - Daily min/max/avg rows for snapshots past retention
       • analytics_config.json - Server-specific configuration
+    - /json/server_member_tracking/fleet_index.json holds one summary per server
+      (latest count, 7/30-day growth, last snapshot), updated on every snapshot;
+      `<p>analytics fleet` answers from it without opening any snapshot log
+    - Taking a snapshot appends a single line instead of rewriting the history
+    - `<p>analytics storage binary` switches a server to member_snapshots.bin,
+      fixed-size packed records (~45 bytes per snapshot) that load without JSON
+      parsing; `<p>analytics storage jsonl` switches back
+    - In memory, snapshots are held as typed columns and only turned into
+      dicts for the rows a report actually shows
+    - Retention pruning runs as a background compaction pass (at most once
+      every 24 hours per server, or right after the retention period changes)
+    - Snapshots that age out are folded into one daily rollup row each, kept
+      for 365 days; trends and comparisons beyond 30 days, or reaching past
+      the raw snapshots, read the daily tier instead of raw snapshots
+    - Legacy member_snapshots.json files are migrated to the log on first use
+    - JSON documents are written atomically (temp file + rename) and keep the
+      previous generation as a .bak; a corrupt file is moved aside and restored
+      from that backup instead of being overwritten with empty data
+    - Parsed snapshots and config are cached in memory per server; writes are
+      coalesced and flushed to disk in the background a few seconds later
     
     NOTES:
     - Snapshots can be taken manually via command or automatically daily
+    - Channel-type counts are kept up to date from channel create, delete and
+      update events; a full recount runs only on a server's first snapshot
+      after startup or via `<p>analytics recount`. Bots are counted from the
+      member cache on every snapshot, since that cache fills in over time
+    - Auto snapshots are gated by an in-memory schedule of next-due times, so
+      message events never touch the disk unless a snapshot is actually due
+    - `<p>analytics members` renders its chart as a PNG in-process (no plotting
+      library), downsampled to one column per pixel and cached per server until
+      new snapshots arrive
     - Data is retained for 30 days
     - Each server has its own separate data storage
-    - All timestamps are in UTC by default but displayed in your chosen timezone
+    - All timestamps are in UTC by default but displayed in your chosen timezone;
+      abbreviations (EST, CET, ...) map to IANA zones and any IANA name such as
+      Europe/Berlin works, with daylight saving time applied per timestamp
+    - IANA names need a time zone database. Windows has none built in, so
+      install it there with `pip install tzdata`; without it only UTC and the
+      abbreviations work, as fixed offsets without daylight saving time
     - Numbers are formatted with commas for readability
     - Safe to use alongside other scripts
     """
@@ -101,18 +151,80 @@ def server_analytics():
     import json
 
     BASE_DIR = Path(getScriptsPath()) / "json" / "server_member_tracking"
+    FLEET_INDEX_PATH = BASE_DIR / "fleet_index.json"
     import asyncio
     import re
     from pathlib import Path
-    from datetime import datetime, timedelta
+    from datetime import datetime, timedelta, timezone as dt_timezone
     from collections import defaultdict
     import time
-    import random
     import math
+    import os
+    import threading
+    import atexit
+    import struct
+    import csv
+    import gzip
+    import io
+    import zlib
+    from array import array
+    from bisect import bisect_left, bisect_right
+    import heapq
+    from zoneinfo import ZoneInfo, ZoneInfoNotFoundError, available_timezones
 
     # Constants
     DEFAULT_AUTO_SNAPSHOT_INTERVAL_HOURS = 20
     DATA_RETENTION_DAYS = 90
+    COMPACTION_INTERVAL_HOURS = 24
+    ROLLUP_RETENTION_DAYS = 365
+    LONG_RANGE_DAYS = 30  # Queries spanning more than this use the daily tier
+    WRITE_BEHIND_DELAY_SECONDS = 2
+    SNAPSHOT_ALL_CONCURRENCY = 8
+    AUTO_SNAPSHOT_RETRY_SECONDS = 60  # First retry after a failed auto snapshot; doubles per failure
+    AUTO_SNAPSHOT_RETRY_MAX_SECONDS = 6 * 3600
+    FLEET_WINDOWS = (7, 30)  # Growth windows (days) kept in the fleet index
+    FLEET_DEFAULT_LIMIT = 10
+    EPOCH = datetime(1970, 1, 1)
+    
+    # Snapshot fields and their typecodes. The same codes drive the in-memory
+    # columns (array) and the fixed-size records of the binary log (struct).
+    SNAPSHOT_COLUMNS = (
+        ("timestamp", "d"),  # epoch seconds, UTC
+        ("member_count", "q"),
+        ("channel_count", "i"),
+        ("role_count", "i"),
+        ("categories", "i"),
+        ("text_channels", "i"),
+        ("voice_channels", "i"),
+        ("bots", "q"),
+        ("is_auto", "b"),
+    )
+    SNAPSHOT_RECORD = struct.Struct("<" + "".join(code for _, code in SNAPSHOT_COLUMNS))
+    STORAGE_FORMATS = ("jsonl", "binary")
+    # Channel types counted in snapshots, mapped to their snapshot field
+    CHANNEL_TYPE_COUNTERS = {"text": "text_channels", "voice": "voice_channels", "category": "categories"}
+    EXPORT_COLUMNS = ("timestamp", "member_count", "channel_count", "text_channels",
+                      "voice_channels", "categories", "role_count", "bots", "is_auto")
+    DEFAULT_EXPORT_COLUMNS = EXPORT_COLUMNS[:-1]
+    EXPORT_BATCH_ROWS = 1000
+    CHART_STYLES = ("image", "emoji", "text")
+    CHART_WIDTH = 720
+    CHART_HEIGHT = 240
+    CHART_MARGIN = 12
+    CHART_GRID_LINES = 4
+    # Palette indexes of the chart PNG and their RGB colors
+    CHART_BACKGROUND, CHART_GRID, CHART_FILL, CHART_FILL_GRID, CHART_LINE = range(5)
+    CHART_PALETTE = bytes((
+        0x2B, 0x2D, 0x31,  # background
+        0x3A, 0x3C, 0x42,  # grid
+        0x35, 0x3D, 0x6B,  # area under the line
+        0x42, 0x4A, 0x7A,  # grid over the area
+        0x58, 0x65, 0xF2,  # line
+    ))
+    
+    # Two-sided 95% Student-t critical values by degrees of freedom
+    T_CRITICAL_95 = {1: 12.71, 2: 4.30, 3: 3.18, 4: 2.78, 5: 2.57, 6: 2.45, 7: 2.36,
+                     8: 2.31, 9: 2.26, 10: 2.23, 15: 2.13, 20: 2.09, 30: 2.04}
     
     AUTO_SNAPSHOT_CONFIG_KEY = "server_analytics_auto_snapshot"
     LAST_AUTO_SNAPSHOT_KEY = "server_analytics_last_auto"
@@ -121,96 +233,189 @@ def server_analytics():
     TIMEZONE_CONFIG_KEY = "server_analytics_timezone"
     DEFAULT_TIMEZONE = "UTC"
     
-    # Timezone offsets (in hours from UTC)
-    TIMEZONE_OFFSETS = {
-    "UTC": 0,
-    "EST": -4,  # Eastern Standard Time (adjusted to match current EDT)
-    "EDT": -4,  # Eastern Daylight Time
-    "CST": -6,  # Central Standard Time
-    "CDT": -5,  # Central Daylight Time
-    "MST": -7,  # Mountain Standard Time
-    "MDT": -6,  # Mountain Daylight Time
-    "PST": -8,  # Pacific Standard Time
-    "PDT": -7,  # Pacific Daylight Time
-    "AKST": -9, # Alaska Standard Time
-    "AKDT": -8, # Alaska Daylight Time
-    "HST": -10, # Hawaii Standard Time
-    "AEST": 10, # Australian Eastern Standard Time
-    "AEDT": 11, # Australian Eastern Daylight Time
-    "GMT": 0,   # Greenwich Mean Time
-    "BST": 1,   # British Summer Time
-    "CET": 1,   # Central European Time
-    "CEST": 2,  # Central European Summer Time
-    "JST": 9,   # Japan Standard Time
-    "IST": 5.5, # India Standard Time (note: "IST" can also mean Irish Standard Time)
+    # Common abbreviations mapped to IANA zones; conversion goes through zoneinfo,
+    # so daylight saving time is applied per timestamp. Any IANA name is accepted too.
+    TIMEZONE_ALIASES = {
+        "UTC": "UTC",
+        "GMT": "Europe/London",
+        "BST": "Europe/London",
+        "EST": "America/New_York",
+        "EDT": "America/New_York",
+        "CST": "America/Chicago",
+        "CDT": "America/Chicago",
+        "MST": "America/Denver",
+        "MDT": "America/Denver",
+        "PST": "America/Los_Angeles",
+        "PDT": "America/Los_Angeles",
+        "AKST": "America/Anchorage",
+        "AKDT": "America/Anchorage",
+        "HST": "Pacific/Honolulu",
+        "AEST": "Australia/Sydney",
+        "AEDT": "Australia/Sydney",
+        "CET": "Europe/Paris",
+        "CEST": "Europe/Paris",
+        "JST": "Asia/Tokyo",
+        "IST": "Asia/Kolkata",  # note: "IST" can also mean Irish Standard Time
+    }
+    # Fixed-offset stand-ins for the abbreviations when there is no tz database
+    FIXED_OFFSET_HOURS = {
+        "UTC": 0, "GMT": 0, "BST": 1, "EST": -5, "EDT": -4, "CST": -6, "CDT": -5,
+        "MST": -7, "MDT": -6, "PST": -8, "PDT": -7, "AKST": -9, "AKDT": -8, "HST": -10,
+        "AEST": 10, "AEDT": 11, "CET": 1, "CEST": 2, "JST": 9, "IST": 5.5,
     }
+    UTC_ZONE = dt_timezone.utc
 
     # Ensure base directory exists
     BASE_DIR.mkdir(parents=True, exist_ok=True)
 
+    known_server_dirs = set()
+
     def get_server_dir(guild_id):
         """Get the directory for a specific server's data"""
         server_dir = BASE_DIR / str(guild_id)
-        server_dir.mkdir(parents=True, exist_ok=True)
+        if guild_id not in known_server_dirs:
+            server_dir.mkdir(parents=True, exist_ok=True)
+            known_server_dirs.add(guild_id)
         return server_dir
 
     def get_server_files(guild_id):
         """Get file paths for a specific server's data"""
         server_dir = get_server_dir(guild_id)
         return {
-            'snapshots': server_dir / "member_snapshots.json",
+            'snapshots': server_dir / "member_snapshots.jsonl",
+            'binary_snapshots': server_dir / "member_snapshots.bin",
+            'rollups': server_dir / "member_rollups.jsonl",
+            'legacy_snapshots': server_dir / "member_snapshots.json",
             'config': server_dir / "analytics_config.json"
         }
         
+    # Zones by configured name and formatters by (zone, format), built once
+    zone_cache = {}
+    time_formatters = {}
+    iana_names = {}
+        
     def get_timezone():
         """Get the configured timezone or default to UTC"""
         return getConfigData().get(TIMEZONE_CONFIG_KEY, DEFAULT_TIMEZONE)
         
-    def get_timezone_offset():
-        """Get the timezone offset in hours from UTC"""
-        timezone = get_timezone()
-        return TIMEZONE_OFFSETS.get(timezone, 0)
+    def zone_key(zone):
+        """Display name of a ZoneInfo or fixed-offset zone"""
+        return getattr(zone, "key", None) or zone.tzname(None)
         
-    def format_time_in_timezone(utc_time, format_str="%b %d, %I:%M %p"):
-        """Format a UTC time in the configured timezone"""
-        timezone = get_timezone()
-        offset = get_timezone_offset()
+    def lookup_zone(name):
+        """Resolve an abbreviation or IANA name (any case) to a tzinfo; None if unknown"""
+        name = name.strip()
+        alias = name.upper()
+        if alias in TIMEZONE_ALIASES:
+            try:
+                return ZoneInfo(TIMEZONE_ALIASES[alias])
+            except ZoneInfoNotFoundError:
+                # No tz database (Windows without tzdata)
+                if alias == "UTC":
+                    return UTC_ZONE
+                return dt_timezone(timedelta(hours=FIXED_OFFSET_HOURS[alias]), alias)
+        if "/" not in name:
+            return None
+        try:
+            return ZoneInfo(name)
+        except (ZoneInfoNotFoundError, ValueError):
+            pass
+        if not iana_names:
+            iana_names.update((zone.lower(), zone) for zone in available_timezones())
+        canonical = iana_names.get(name.lower())
+        return ZoneInfo(canonical) if canonical else None
         
-        # Apply the offset
-        local_time = utc_time + timedelta(hours=offset)
+    def resolve_timezone():
+        """
+        The configured zone, read from config once. Resolve it once per command
+        and pass it to format_time_in_timezone for every timestamp shown.
+        """
+        name = get_timezone()
+        zone = zone_cache.get(name)
+        if zone is None:
+            zone = lookup_zone(name) or UTC_ZONE
+            zone_cache[name] = zone
+        return zone
         
-        # Format the time
-        formatted_time = local_time.strftime(format_str)
+    def get_time_formatter(zone, format_str):
+        """Cached callable formatting naive UTC datetimes in `zone`"""
+        key = (zone_key(zone), format_str)
+        formatter = time_formatters.get(key)
+        if formatter is None:
+            # %Z gives the abbreviation in effect at that instant (EST vs EDT)
+            local_format = f"{format_str} %Z"
+            
+            def formatter(utc_time):
+                return utc_time.replace(tzinfo=UTC_ZONE).astimezone(zone).strftime(local_format)
+            
+            time_formatters[key] = formatter
+        return formatter
         
-        # Add the timezone abbreviation
-        return f"{formatted_time} {timezone}"
+    def format_time_in_timezone(utc_time, format_str="%b %d, %I:%M %p", zone=None):
+        """Format a UTC time in the configured timezone (or `zone` when given)"""
+        return get_time_formatter(zone or resolve_timezone(), format_str)(utc_time)
+    
+    # In-memory caches keyed by guild id, kept coherent with every write
+    snapshot_cache = {}
+    rollup_cache = {}
+    chart_cache = {}
+    daily_series_cache = {}
+    config_cache = {}
+    
+    # Per-guild writer lock: snapshots, compaction, clearing and storage
+    # conversion for one guild never overlap (e.g. a clear racing a compaction
+    # that would rename the old log back into place)
+    guild_locks = defaultdict(asyncio.Lock)
+    
+    # Write-behind queue: pending snapshots and the latest config per guild
+    pending_appends = defaultdict(list)
+    pending_configs = {}
+    pending_lock = threading.Lock()
+    # Held for a whole flush, so a bulk flush and the background flusher never
+    # write at the same time, and a first read of a log never misses a flush
+    flush_lock = threading.Lock()
+    flush_state = {"task": None}
+    
+    # Fleet index: one summary entry per tracked guild, keyed by guild id string,
+    # so cross-guild queries never open the per-guild snapshot logs
+    fleet_index = {}
+    fleet_state = {"loaded": False, "dirty": False}
     
     # Server configuration management
     def load_server_config(guild_id):
-        """Load server-specific configuration"""
+        """Load server-specific configuration (served from cache after the first read)"""
+        config = config_cache.get(guild_id)
+        if config is not None:
+            return config
+            
         files = get_server_files(guild_id)
         
         # Create default config if it doesn't exist
-        if not files['config'].exists():
+        if not files['config'].exists() and not backup_path(files['config']).exists():
             default_config = {
                 "auto_snapshot": False,
                 "last_auto_snapshot": None,
                 "first_snapshot_date": None,
-                "chart_style": "emoji",  # Options: emoji, text
+                "chart_style": "image",  # Options: image, emoji, text
                 "snapshot_retention_days": DATA_RETENTION_DAYS,
+                "rollup_retention_days": ROLLUP_RETENTION_DAYS,
                 "auto_snapshot_interval_hours": DEFAULT_AUTO_SNAPSHOT_INTERVAL_HOURS,
+                "last_compaction": None,
+                "storage_format": "jsonl",  # Options: jsonl, binary
             }
-            save_data(files['config'], default_config)
+            config_cache[guild_id] = default_config
+            queue_write(guild_id, config=default_config)
             return default_config
             
-        return load_data(files['config'])
+        config = load_data(files['config'])
+        config_cache[guild_id] = config
+        return config
         
     def update_server_config(guild_id, key, value):
         """Update a specific server configuration value"""
-        files = get_server_files(guild_id)
         config = load_server_config(guild_id)
         config[key] = value
-        save_data(files['config'], config)
+        queue_write(guild_id, config=config)
         return config
         
     def is_auto_snapshot_enabled(guild_id):
@@ -218,136 +423,909 @@ def server_analytics():
         config = load_server_config(guild_id)
         return config.get("auto_snapshot", False)
         
-    def should_take_auto_snapshot(guild_id):
-        """Return True if enough time has passed for an automatic snapshot."""
+    # Auto-snapshot scheduling: epoch second at which each enabled guild is next due.
+    # Guilds without auto snapshots are absent, so the on_message gate is a dict lookup.
+    auto_snapshot_due = {}
+    auto_snapshot_failures = {}  # guild id -> consecutive failed auto snapshots
+
+    def refresh_auto_snapshot_schedule(guild_id):
+        """Recompute a guild's next due time from its (cached) config"""
         config = load_server_config(guild_id)
-        last_snapshot = config.get("last_auto_snapshot")
+        if not config.get("auto_snapshot", False):
+            auto_snapshot_due.pop(guild_id, None)
+            return
+            
         interval = config.get(
             "auto_snapshot_interval_hours",
             DEFAULT_AUTO_SNAPSHOT_INTERVAL_HOURS,
         )
-
+        last_snapshot = config.get("last_auto_snapshot")
         if not last_snapshot:
-            return True
+            auto_snapshot_due[guild_id] = 0
+        else:
+            last_time = datetime.fromisoformat(last_snapshot)
+            auto_snapshot_due[guild_id] = (last_time - EPOCH).total_seconds() + interval * 3600
 
-        last_time = datetime.fromisoformat(last_snapshot)
-        now = datetime.utcnow()
+    def load_auto_snapshot_schedule():
+        """Build the schedule once at startup from the guilds that already have data"""
+        for server_dir in BASE_DIR.iterdir():
+            if not server_dir.name.isdigit() or not (server_dir / "analytics_config.json").exists():
+                continue
+            try:
+                refresh_auto_snapshot_schedule(int(server_dir.name))
+            except Exception as e:
+                print(f"Error loading auto-snapshot schedule for {server_dir.name}: {str(e)}", type_="ERROR")
+
+    # Serializes appends against the final swap of a background compaction
+    snapshot_log_lock = threading.Lock()
+
+    async def run_in_thread(func, *args, **kwargs):
+        """Runs a synchronous function in a separate thread."""
+        loop = asyncio.get_event_loop()
+        return await loop.run_in_executor(None, lambda: func(*args, **kwargs))
+
+    # Columnar snapshot representation
+    def iso_to_epoch(timestamp):
+        """Convert a naive UTC ISO timestamp to epoch seconds"""
+        return (datetime.fromisoformat(timestamp) - EPOCH).total_seconds()
+
+    def epoch_to_iso(seconds):
+        """Convert epoch seconds back to the ISO string stored in snapshots"""
+        return (EPOCH + timedelta(microseconds=round(seconds * 1e6))).isoformat()
+
+    def snapshot_record(snapshot):
+        """Flatten a snapshot dict into a tuple ordered like SNAPSHOT_COLUMNS"""
+        return tuple(
+            iso_to_epoch(snapshot["timestamp"]) if name == "timestamp" else int(snapshot.get(name) or 0)
+            for name, _ in SNAPSHOT_COLUMNS
+        )
+
+    class SnapshotColumns:
+        """
+        Snapshots stored as one typed array per field instead of one dict per
+        snapshot (~45 bytes per snapshot instead of several hundred). Rows are
+        only turned into dicts when a caller asks for them.
+        """
+        def __init__(self):
+            self.columns = {name: array(code) for name, code in SNAPSHOT_COLUMNS}
+            self.timestamps = self.columns["timestamp"]
 
-        return (now - last_time).total_seconds() >= interval * 3600
+        def __len__(self):
+            return len(self.timestamps)
+
+        def __iter__(self):
+            for index in range(len(self)):
+                yield self.row(index)
+
+        def append(self, snapshot):
+            self.append_record(snapshot_record(snapshot))
+
+        def append_record(self, record):
+            for (name, _), value in zip(SNAPSHOT_COLUMNS, record):
+                self.columns[name].append(value)
+
+        def record(self, index):
+            return tuple(self.columns[name][index] for name, _ in SNAPSHOT_COLUMNS)
+
+        def row(self, index):
+            """Materialize a single snapshot as a dict"""
+            snapshot = {name: self.columns[name][index] for name, _ in SNAPSHOT_COLUMNS}
+            snapshot["timestamp"] = epoch_to_iso(snapshot["timestamp"])
+            snapshot["is_auto"] = bool(snapshot["is_auto"])
+            return snapshot
+
+        def ensure_sorted(self):
+            """Reorder rows chronologically if the log was written out of order"""
+            timestamps = self.timestamps
+            if all(timestamps[i] <= timestamps[i + 1] for i in range(len(timestamps) - 1)):
+                return
+            order = sorted(range(len(timestamps)), key=timestamps.__getitem__)
+            for name, code in SNAPSHOT_COLUMNS:
+                self.columns[name] = array(code, (self.columns[name][i] for i in order))
+            self.timestamps = self.columns["timestamp"]
+
+        def prune_before(self, cutoff):
+            """Drop snapshots taken at or before `cutoff` (epoch seconds)"""
+            start = bisect_right(self.timestamps, cutoff)
+            if start:
+                for column in self.columns.values():
+                    del column[:start]
+            return start
 
     # Initialize data structures if they don't exist
+    initialized_guilds = set()
+    
     def initialize_data(guild_id):
+        if guild_id in initialized_guilds:
+            return
         files = get_server_files(guild_id)
         
-        if not files['snapshots'].exists():
-            with open(files['snapshots'], "w") as f:
-                json.dump({"snapshots": []}, f, indent=4)
+        if not files['snapshots'].exists() and snapshot_log_path(guild_id) == files['snapshots']:
+            migrate_legacy_snapshots(files)
         
         # Initialize server config
         load_server_config(guild_id)
+        initialized_guilds.add(guild_id)
+
+    def migrate_legacy_snapshots(files):
+        """Convert a legacy member_snapshots.json document into the append-only log"""
+        legacy = load_data(files['legacy_snapshots']) if files['legacy_snapshots'].exists() else {}
+        snapshots = sorted(legacy.get("snapshots", []), key=lambda x: x["timestamp"])
+        
+        tmp_path = files['snapshots'].with_suffix(".jsonl.tmp")
+        with open(tmp_path, "w") as f:
+            for snapshot in snapshots:
+                f.write(json.dumps(snapshot, separators=(",", ":")) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, files['snapshots'])
+        
+        if files['legacy_snapshots'].exists():
+            files['legacy_snapshots'].replace(files['legacy_snapshots'].with_suffix(".json.migrated"))
+            print(f"Migrated {len(snapshots)} snapshots to {files['snapshots'].name}", type_="INFO")
+
+    def backup_path(file_path):
+        """Previous generation of a JSON document, kept by save_data"""
+        return file_path.with_suffix(file_path.suffix + ".bak")
 
     # Load data from JSON files
     def load_data(file_path):
+        """
+        Load a JSON document ({} if it doesn't exist). A corrupt file is moved
+        aside rather than left to be overwritten, and the previous generation is
+        restored from its backup when one is readable.
+        """
         try:
             with open(file_path, "r") as f:
                 return json.load(f)
-        except (FileNotFoundError, json.JSONDecodeError):
+        except FileNotFoundError:
+            # A crash between the two renames in save_data leaves only the backup
+            if not backup_path(file_path).exists():
+                return {}
+            problem = "missing"
+        except (json.JSONDecodeError, UnicodeDecodeError):
+            problem = "corrupt"
+            corrupt_path = file_path.with_suffix(file_path.suffix + f".corrupt-{int(time.time())}")
+            os.replace(file_path, corrupt_path)
+            print(f"{file_path} is corrupt; moved it to {corrupt_path.name}", type_="ERROR")
+            
+        try:
+            with open(backup_path(file_path), "r") as f:
+                data = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError, UnicodeDecodeError):
+            print(f"{file_path} is {problem} and has no usable backup", type_="ERROR")
             return {}
+            
+        save_data(file_path, data)
+        print(f"Restored {file_path.name} from its backup ({problem})", type_="INFO")
+        return data
 
     # Save data to JSON files
     def save_data(file_path, data):
-        with open(file_path, "w") as f:
+        """
+        Write atomically: dump to a temp file, fsync, keep the current file as
+        the .bak generation, then rename the temp file into place.
+        """
+        tmp_path = file_path.with_suffix(file_path.suffix + ".tmp")
+        with open(tmp_path, "w") as f:
             json.dump(data, f, indent=4)
+            f.flush()
+            os.fsync(f.fileno())
+        if file_path.exists():
+            os.replace(file_path, backup_path(file_path))
+        os.replace(tmp_path, file_path)
 
-    # Take a server snapshot
-    async def take_snapshot(guild, is_auto=False):
-        files = get_server_files(guild.id)
-        initialize_data(guild.id)  # Ensure files exist
+    # Write-behind flushing
+    def queue_write(guild_id, snapshot=None, config=None):
+        """Queue a snapshot and/or config document; repeated config updates coalesce"""
+        with pending_lock:
+            if snapshot is not None:
+                pending_appends[guild_id].append(snapshot)
+            if config is not None:
+                pending_configs[guild_id] = dict(config)
+        schedule_flush()
+
+    def schedule_flush():
+        """Start the background flusher unless one is already waiting"""
+        task = flush_state["task"]
+        if task is not None and not task.done():
+            return
+        try:
+            loop = asyncio.get_event_loop()
+        except RuntimeError:
+            loop = None
+        if loop is None or not loop.is_running():
+            # No event loop (script loading); write through immediately
+            flush_pending()
+            return
+        flush_state["task"] = loop.create_task(flush_writes_later())
+
+    def flush_pending():
+        """Persist everything queued so far (blocking; run from a worker thread)"""
+        with flush_lock:
+            write_pending()
+    
+    def write_pending():
+        with pending_lock:
+            appends = dict(pending_appends)
+            configs = dict(pending_configs)
+            pending_appends.clear()
+            pending_configs.clear()
+            fleet = dict(fleet_index) if fleet_state["dirty"] else None
+            fleet_state["dirty"] = False
         
-        # Load existing data
-        data = load_data(files['snapshots'])
+        for guild_id, snapshots in appends.items():
+            log_path = snapshot_log_path(guild_id)
+            data = b"".join(encode_snapshot(snapshot, log_path) for snapshot in snapshots)
+            with snapshot_log_lock:
+                with open(log_path, "ab") as f:
+                    if is_binary_log(log_path):
+                        # Drop a torn record left by an interrupted write so records stay aligned
+                        size = f.seek(0, os.SEEK_END)
+                        if size % SNAPSHOT_RECORD.size:
+                            f.truncate(size - size % SNAPSHOT_RECORD.size)
+                    f.write(data)
         
-        # Get channel and role counts
-        voice_channels = 0
-        text_channels = 0
-        categories = 0
-        for channel in guild.channels:
-            channel_type = str(channel.type).lower()
-            if channel_type == "text":
-                text_channels += 1
-            elif channel_type == "voice":
-                voice_channels += 1
-            elif channel_type == "category":
-                categories += 1
-        
-        # Create snapshot
-        timestamp = datetime.utcnow()
-        snapshot = {
-            "timestamp": timestamp.isoformat(),
-            "member_count": guild.member_count,
-            "channel_count": len(guild.channels),
-            "role_count": len(guild.roles),
-            "categories": categories,
-            "text_channels": text_channels,
-            "voice_channels": voice_channels,
-            "bots": len([m for m in guild.members if m.bot]),
-            "is_auto": is_auto
-        }
+        for guild_id, config in configs.items():
+            save_data(get_server_files(guild_id)['config'], config)
         
-        if "snapshots" not in data:
-            data["snapshots"] = []
-            
-        data["snapshots"].append(snapshot)
+        if fleet is not None:
+            save_data(FLEET_INDEX_PATH, fleet)
+
+    async def flush_writes():
+        """Flush queued writes off the event loop"""
+        try:
+            await run_in_thread(flush_pending)
+        except Exception as e:
+            print(f"Error flushing analytics data: {str(e)}", type_="ERROR")
+
+    async def flush_writes_later():
+        """Wait briefly so bursts of updates are written together"""
+        while True:
+            await asyncio.sleep(WRITE_BEHIND_DELAY_SECONDS)
+            await flush_writes()
+            with pending_lock:
+                if not pending_appends and not pending_configs and not fleet_state["dirty"]:
+                    break
+
+    # Don't lose queued writes when the process exits
+    atexit.register(flush_pending)
+
+    # Snapshot log access
+    def snapshot_log_path(guild_id):
+        """Path of the guild's snapshot log in its configured storage format"""
+        files = get_server_files(guild_id)
+        if load_server_config(guild_id).get("storage_format") == "binary":
+            return files['binary_snapshots']
+        return files['snapshots']
+
+    def is_binary_log(log_path):
+        return log_path.suffix == ".bin"
+
+    def encode_snapshot(snapshot, log_path):
+        """Encode one snapshot as a log record for the given log file"""
+        if is_binary_log(log_path):
+            return SNAPSHOT_RECORD.pack(*snapshot_record(snapshot))
+        return (json.dumps(snapshot, separators=(",", ":")) + "\n").encode()
+
+    def iter_snapshots(log_path):
+        """Stream snapshot dicts from a JSON-lines log in the order they were taken"""
+        try:
+            with open(log_path, "r") as f:
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        yield json.loads(line)
+                    except json.JSONDecodeError:
+                        # A torn final line from an interrupted append; skip it
+                        continue
+        except FileNotFoundError:
+            return
+
+    def read_snapshot_columns(log_path):
+        """Load a snapshot log of either format into columns"""
+        snapshots = SnapshotColumns()
+        if is_binary_log(log_path):
+            try:
+                data = log_path.read_bytes()
+            except FileNotFoundError:
+                return snapshots
+            usable = len(data) - len(data) % SNAPSHOT_RECORD.size
+            for record in SNAPSHOT_RECORD.iter_unpack(memoryview(data)[:usable]):
+                snapshots.append_record(record)
+        else:
+            for snapshot in iter_snapshots(log_path):
+                snapshots.append(snapshot)
+        snapshots.ensure_sorted()
+        return snapshots
+
+    def get_snapshots(guild_id):
+        """
+        Return the cached SnapshotColumns, reading the log only on first access.
+        Safe to call from a worker thread (take_snapshot does, to keep the first
+        read off the event loop).
+        """
+        snapshots = snapshot_cache.get(guild_id)
+        if snapshots is None:
+            initialize_data(guild_id)
+            with flush_lock:
+                snapshots = read_snapshot_columns(snapshot_log_path(guild_id))
+                with pending_lock:
+                    if guild_id in snapshot_cache:
+                        return snapshot_cache[guild_id]
+                    # Include snapshots that are queued but not yet flushed
+                    for snapshot in pending_appends.get(guild_id, []):
+                        snapshots.append(snapshot)
+                    snapshot_cache[guild_id] = snapshots
+        return snapshots
+
+    def append_snapshot(guild_id, snapshot):
+        """Append one snapshot to the cache and queue it for the log"""
+        with pending_lock:
+            # Under the lock, so a first read in a worker thread sees it exactly once
+            if guild_id in snapshot_cache:
+                snapshot_cache[guild_id].append(snapshot)
+            pending_appends[guild_id].append(snapshot)
+        schedule_flush()
+
+    def clear_snapshots(guild_id):
+        """Truncate the snapshot log"""
+        with pending_lock:
+            pending_appends.pop(guild_id, None)
+        snapshot_cache[guild_id] = SnapshotColumns()
+        rollup_cache[guild_id] = []
+        with snapshot_log_lock:
+            with open(snapshot_log_path(guild_id), "wb"):
+                pass
+        get_server_files(guild_id)['rollups'].unlink(missing_ok=True)
+
+    def convert_storage_format(guild_id, storage_format):
+        """Rewrite the guild's snapshot log in another storage format"""
+        snapshots = get_snapshots(guild_id)
+        old_path = snapshot_log_path(guild_id)
+        config = load_server_config(guild_id)
+        config["storage_format"] = storage_format
+        new_path = snapshot_log_path(guild_id)
+        if new_path == old_path:
+            queue_write(guild_id, config=config)
+            return len(snapshots)
         
-        # Update server config
-        config = load_server_config(guild.id)
-        if is_auto:
-            config["last_auto_snapshot"] = timestamp.isoformat()
+        with pending_lock:
+            # Queued snapshots are already in the cache and get written below
+            pending_appends.pop(guild_id, None)
+        
+        data = b"".join(
+            encode_snapshot(snapshots.row(i), new_path) for i in range(len(snapshots))
+        )
+        tmp_path = new_path.with_suffix(new_path.suffix + ".tmp")
+        with snapshot_log_lock:
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, new_path)
+        
+        # The config must point at the new log on disk before the old one goes
+        with flush_lock:
+            with pending_lock:
+                pending_configs.pop(guild_id, None)
+            save_data(get_server_files(guild_id)['config'], config)
+            with snapshot_log_lock:
+                if old_path.exists():
+                    old_path.unlink()
+        return len(snapshots)
+
+    def compact_snapshot_log(log_path, cutoff, before_swap=None):
+        """
+        Rewrite the log keeping only snapshots newer than `cutoff` (epoch seconds).
+        Runs in a worker thread; records appended while it runs are carried over.
+        `before_swap(aged_out)` runs before the shortened log replaces the old one,
+        so the aged-out records are saved elsewhere first; if it raises, the old
+        log is left untouched. Returns (kept, dropped, aged-out records).
+        """
+        with snapshot_log_lock:
+            start_size = log_path.stat().st_size if log_path.exists() else None
+        if start_size is None:
+            if before_swap is not None:
+                before_swap([])
+            return 0, 0, []
+        
+        binary = is_binary_log(log_path)
+        tmp_path = log_path.with_suffix(log_path.suffix + ".tmp")
+        kept = 0
+        dropped = 0
+        consumed = 0
+        aged_out = []
+        with open(log_path, "rb") as src, open(tmp_path, "wb") as dst:
+            while consumed < start_size:
+                raw = src.read(SNAPSHOT_RECORD.size) if binary else src.readline()
+                if not raw or (binary and len(raw) < SNAPSHOT_RECORD.size):
+                    break
+                consumed += len(raw)
+                if not raw.strip():
+                    continue
+                try:
+                    if binary:
+                        record = SNAPSHOT_RECORD.unpack(raw)
+                    else:
+                        record = snapshot_record(json.loads(raw))
+                except (ValueError, KeyError):
+                    dropped += 1
+                    continue
+                if record[0] > cutoff:
+                    dst.write(raw if binary or raw.endswith(b"\n") else raw + b"\n")
+                    kept += 1
+                else:
+                    aged_out.append(record)
+                    dropped += 1
+            if binary:
+                # Skip a torn trailing record
+                consumed = start_size
             
-        # Store first snapshot date if this is the first one
-        if not config.get("first_snapshot_date") and data["snapshots"]:
-            config["first_snapshot_date"] = data["snapshots"][0]["timestamp"]
+            if before_swap is not None:
+                try:
+                    before_swap(aged_out)
+                except Exception:
+                    dst.close()
+                    tmp_path.unlink(missing_ok=True)
+                    raise
+        
+            # Copy anything appended during the pass, then swap files atomically
+            with snapshot_log_lock:
+                src.seek(consumed)
+                dst.write(src.read())
+                dst.flush()
+                os.fsync(dst.fileno())
+                src.close()
+                dst.close()
+                os.replace(tmp_path, log_path)
+        
+        return kept, dropped, aged_out
+
+    # Daily rollup tier: snapshots that age out of the raw log are folded into
+    # one min/max/avg row per UTC day (plus the day's last values), kept for
+    # rollup_retention_days
+    def fold_into_days(days, record):
+        """Fold one snapshot record into a dict of daily rollup rows keyed by day"""
+        values = dict(zip((name for name, _ in SNAPSHOT_COLUMNS), record))
+        timestamp = values.pop("timestamp")
+        values.pop("is_auto")
+        members = values["member_count"]
+        day = (EPOCH + timedelta(seconds=timestamp)).date().isoformat()
+        
+        row = days.get(day)
+        if row is None:
+            row = {"day": day, "samples": 0, "member_min": members, "member_max": members,
+                   "member_sum": 0, "last_ts": timestamp}
+            row.update(values)
+            days[day] = row
+        row["samples"] += 1
+        row["member_min"] = min(row["member_min"], members)
+        row["member_max"] = max(row["member_max"], members)
+        row["member_sum"] += members
+        if timestamp >= row["last_ts"]:
+            row["last_ts"] = timestamp
+            row.update(values)
+
+    def merge_rollup_rows(days, row):
+        """Merge an existing rollup row into a dict of daily rows"""
+        current = days.get(row["day"])
+        if current is None:
+            days[row["day"]] = dict(row)
+            return
+        newer = row if row["last_ts"] >= current["last_ts"] else current
+        merged = dict(newer)
+        merged["samples"] = current["samples"] + row["samples"]
+        merged["member_min"] = min(current["member_min"], row["member_min"])
+        merged["member_max"] = max(current["member_max"], row["member_max"])
+        merged["member_sum"] = current["member_sum"] + row["member_sum"]
+        days[row["day"]] = merged
+
+    def read_rollups(rollup_path):
+        """Read the rollup tier (at most one row per day)"""
+        rows = []
+        for row in iter_snapshots(rollup_path):
+            if "day" in row:
+                rows.append(row)
+        rows.sort(key=lambda row: row["day"])
+        return rows
+
+    def update_rollups(rollup_path, aged_out, rollup_cutoff):
+        """
+        Fold aged-out snapshots into the rollup file and drop days older than
+        `rollup_cutoff` (epoch seconds). Blocking; runs in a worker thread.
+        """
+        days = {}
+        for row in read_rollups(rollup_path):
+            merge_rollup_rows(days, row)
+        for record in aged_out:
+            fold_into_days(days, record)
+        
+        rows = [row for _, row in sorted(days.items()) if row["last_ts"] > rollup_cutoff]
+        tmp_path = rollup_path.with_suffix(rollup_path.suffix + ".tmp")
+        with open(tmp_path, "w") as f:
+            for row in rows:
+                f.write(json.dumps(row, separators=(",", ":")) + "\n")
+        os.replace(tmp_path, rollup_path)
+        return rows
+
+    def get_rollups(guild_id):
+        """Return the cached rollup rows, reading the file on first access"""
+        rows = rollup_cache.get(guild_id)
+        if rows is None:
+            rows = read_rollups(get_server_files(guild_id)['rollups'])
+            rollup_cache[guild_id] = rows
+        return rows
+
+    def get_daily_rows(guild_id):
+        """
+        Daily-resolution view of the whole history: rollup rows plus the raw
+        snapshots folded per day. At most a few hundred rows, cached until either
+        tier changes. Each row also carries the day's last snapshot values.
+        """
+        snapshots = get_snapshots(guild_id)
+        rollups = get_rollups(guild_id)
+        key = (len(snapshots), snapshots.timestamps[-1] if len(snapshots) else None,
+               snapshots.timestamps[0] if len(snapshots) else None, len(rollups))
+        cached = daily_series_cache.get(guild_id)
+        if cached is not None and cached[0] == key:
+            return cached[1]
             
-        save_data(files['config'], config)
+        days = {}
+        for row in rollups:
+            merge_rollup_rows(days, row)
+        for index in range(len(snapshots)):
+            fold_into_days(days, snapshots.record(index))
+        
+        rows = []
+        for _, row in sorted(days.items()):
+            row = dict(row)
+            row["timestamp"] = epoch_to_iso(row["last_ts"])
+            row["member_avg"] = row["member_sum"] / row["samples"]
+            rows.append(row)
+        daily_series_cache[guild_id] = (key, rows)
+        return rows
+
+    def get_daily_series(guild_id):
+        """(times, counts) arrays at daily resolution for long-range trends"""
+        rows = get_daily_rows(guild_id)
+        return {
+            "times": array("d", (row["last_ts"] for row in rows)),
+            "counts": array("q", (row["member_count"] for row in rows)),
+        }
+
+    async def compact_snapshots(guild_id, force=False):
+        """Apply snapshot_retention_days to the log in a background thread"""
+        await run_in_thread(initialize_data, guild_id)  # Migrate a legacy file before compacting it
+        config = load_server_config(guild_id)
+        last_compaction = config.get("last_compaction")
+        now = datetime.utcnow()
+        
+        if not force and last_compaction:
+            elapsed = (now - datetime.fromisoformat(last_compaction)).total_seconds()
+            if elapsed < COMPACTION_INTERVAL_HOURS * 3600:
+                return
         
-        # Remove old snapshots
         retention_days = config.get("snapshot_retention_days", DATA_RETENTION_DAYS)
-        cutoff = (datetime.utcnow() - timedelta(days=retention_days)).isoformat()
-        data["snapshots"] = [s for s in data["snapshots"] if s["timestamp"] > cutoff]
+        cutoff = (now - timedelta(days=retention_days) - EPOCH).total_seconds()
+        rollup_days = config.get("rollup_retention_days", ROLLUP_RETENTION_DAYS)
+        rollup_cutoff = (now - timedelta(days=rollup_days) - EPOCH).total_seconds()
         
-        save_data(files['snapshots'], data)
+        try:
+            rollup_path = get_server_files(guild_id)['rollups']
+            rollups = []
+            
+            def roll_up(aged_out):
+                # Aged-out snapshots reach the rollup file before they leave the raw log
+                rollups[:] = update_rollups(rollup_path, aged_out, rollup_cutoff)
+            
+            async with guild_locks[guild_id]:
+                kept, dropped, _ = await run_in_thread(
+                    compact_snapshot_log, snapshot_log_path(guild_id), cutoff, before_swap=roll_up
+                )
+                rollup_cache[guild_id] = rollups
+                if guild_id in snapshot_cache:
+                    snapshot_cache[guild_id].prune_before(cutoff)
+                update_server_config(guild_id, "last_compaction", now.isoformat())
+            if dropped:
+                print(f"Compacted snapshot log for {guild_id}: kept {kept}, rolled up {dropped}", type_="INFO")
+        except Exception as e:
+            print(f"Error compacting snapshot log for {guild_id}: {str(e)}", type_="ERROR")
+
+    # Running compaction tasks; the event loop only keeps weak references to tasks
+    compaction_tasks = set()
+
+    def schedule_compaction(guild_id, force=False):
+        """Run a compaction pass without blocking the caller"""
+        task = asyncio.get_event_loop().create_task(compact_snapshots(guild_id, force=force))
+        compaction_tasks.add(task)
+        task.add_done_callback(compaction_tasks.discard)
+
+    # Per-guild counters. Channels by type are maintained from channel events so
+    # snapshots don't rescan the channel list; bots are re-read from the member
+    # cache on every snapshot, because a selfbot's cache fills in lazily (README 1.4)
+    guild_counters = {}
+
+    def count_bots(guild):
+        return sum(1 for member in guild.members if member.bot)
+
+    def recount_guild(guild):
+        """Full recount; only runs the first time a guild is snapshotted or on demand"""
+        counters = {"bots": count_bots(guild), "text_channels": 0, "voice_channels": 0, "categories": 0}
+        for channel in guild.channels:
+            counter = CHANNEL_TYPE_COUNTERS.get(str(channel.type).lower())
+            if counter:
+                counters[counter] += 1
+        guild_counters[guild.id] = counters
+        return counters
+
+    def get_guild_counters(guild):
+        counters = guild_counters.get(guild.id)
+        if counters is None:
+            return recount_guild(guild)
+        counters["bots"] = count_bots(guild)
+        return counters
+
+    def adjust_channel_counter(channel, delta):
+        counters = guild_counters.get(channel.guild.id)
+        if counters is None:
+            return
+        counter = CHANNEL_TYPE_COUNTERS.get(str(channel.type).lower())
+        if counter:
+            counters[counter] = max(counters[counter] + delta, 0)
+
+    @bot.listen("on_guild_channel_create")
+    async def count_channel_create(channel):
+        adjust_channel_counter(channel, 1)
+
+    @bot.listen("on_guild_channel_delete")
+    async def count_channel_delete(channel):
+        adjust_channel_counter(channel, -1)
+
+    @bot.listen("on_guild_channel_update")
+    async def count_channel_update(before, after):
+        if str(before.type) != str(after.type):
+            adjust_channel_counter(before, -1)
+            adjust_channel_counter(after, 1)
+
+    @bot.listen("on_guild_remove")
+    async def drop_guild_counters(guild):
+        guild_counters.pop(guild.id, None)
+
+    # Take a server snapshot
+    async def take_snapshot(guild, is_auto=False):
+        # First-use disk work (directory, legacy migration, config, reading the
+        # log) runs in a worker thread, so bulk snapshots overlap their I/O
+        await run_in_thread(get_snapshots, guild.id)
+        
+        async with guild_locks[guild.id]:
+            # Channel-type counts come from the incremental counters, bots from the member cache
+            counters = get_guild_counters(guild)
+            
+            # Create snapshot
+            timestamp = datetime.utcnow()
+            snapshot = {
+                "timestamp": timestamp.isoformat(),
+                "member_count": guild.member_count,
+                "channel_count": len(guild.channels),
+                "role_count": len(guild.roles),
+                "categories": counters["categories"],
+                "text_channels": counters["text_channels"],
+                "voice_channels": counters["voice_channels"],
+                "bots": counters["bots"],
+                "is_auto": is_auto
+            }
+            
+            append_snapshot(guild.id, snapshot)
+            
+            # Update server config
+            config = load_server_config(guild.id)
+            if is_auto:
+                config["last_auto_snapshot"] = timestamp.isoformat()
+            
+            # Store first snapshot date if this is the first one
+            if not config.get("first_snapshot_date"):
+                config["first_snapshot_date"] = snapshot["timestamp"]
+            
+            queue_write(guild.id, config=config)
+            index_guild(guild.id, guild.name)
+        
+        # Retention is applied by a periodic background compaction pass
+        schedule_compaction(guild.id)
         return snapshot
 
+    # Fleet index maintenance
+    def get_fleet_index():
+        """The fleet index, loaded from disk on first use"""
+        if not fleet_state["loaded"]:
+            fleet_index.update(load_data(FLEET_INDEX_PATH))
+            fleet_state["loaded"] = True
+        return fleet_index
+
+    def index_guild(guild_id, name):
+        """Refresh a guild's fleet entry from its in-memory snapshot columns"""
+        index = get_fleet_index()
+        snapshots = get_snapshots(guild_id)
+        if not len(snapshots):
+            entry = None
+        else:
+            times = snapshots.timestamps
+            counts = snapshots.columns["member_count"]
+            entry = {
+                "name": name,
+                "member_count": counts[-1],
+                "last_snapshot": times[-1],
+                "snapshots": len(snapshots),
+            }
+            for days in FLEET_WINDOWS:
+                # Growth since the snapshot closest to `days` ago, and the span it covers
+                start = closest_index(times, times[-1] - days * 86400, len(times) - 1)
+                entry[f"growth_{days}d"] = counts[-1] - counts[start]
+                entry[f"span_{days}d"] = (times[-1] - times[start]) / 86400
+                
+        with pending_lock:
+            if entry is None:
+                index.pop(str(guild_id), None)
+            else:
+                index[str(guild_id)] = entry
+            fleet_state["dirty"] = True
+        schedule_flush()
+
+    async def rebuild_fleet_index(ctx):
+        """Rebuild every entry from the guild directories (reads each snapshot log once)"""
+        status_msg = await ctx.send("rebuilding the fleet index from every tracked server...")
+        index = get_fleet_index()
+        count = 0
+        for server_dir in BASE_DIR.iterdir():
+            if not server_dir.is_dir() or not server_dir.name.isdigit():
+                continue
+            guild_id = int(server_dir.name)
+            guild = bot.get_guild(guild_id)
+            name = guild.name if guild else index.get(server_dir.name, {}).get("name", server_dir.name)
+            try:
+                initialize_data(guild_id)
+                index_guild(guild_id, name)
+                count += 1
+            except Exception as e:
+                print(f"Error indexing analytics data for {guild_id}: {str(e)}", type_="ERROR")
+            # Let other handlers run between guilds
+            await asyncio.sleep(0)
+        await status_msg.edit(content=f"fleet index rebuilt: **{count:,}** servers indexed")
+
+    async def snapshot_all_guilds(ctx):
+        """Snapshot every guild concurrently and report throughput and timings"""
+        guilds = list(bot.guilds)
+        if not guilds:
+            await ctx.send("no servers available to snapshot.")
+            return
+            
+        status_msg = await ctx.send(f"taking snapshots of {len(guilds):,} servers...")
+        semaphore = asyncio.Semaphore(SNAPSHOT_ALL_CONCURRENCY)
+        timings = []
+        failures = []
+        
+        async def snapshot_guild(guild):
+            async with semaphore:
+                started = time.perf_counter()
+                try:
+                    await take_snapshot(guild)
+                    timings.append((time.perf_counter() - started, guild.name))
+                except Exception as e:
+                    failures.append(guild.name)
+                    print(f"Error taking snapshot of {guild.name} (ID: {guild.id}): {str(e)}", type_="ERROR")
+                # Let other handlers run between guilds
+                await asyncio.sleep(0)
+        
+        started = time.perf_counter()
+        await asyncio.gather(*(snapshot_guild(guild) for guild in guilds))
+        # Every guild's log append and config update goes to disk in one batch
+        await flush_writes()
+        elapsed = time.perf_counter() - started
+        
+        timings.sort(reverse=True)
+        average_ms = sum(t for t, _ in timings) / len(timings) * 1000 if timings else 0
+        slowest = "\n".join(f"• {name[:40]}: {t * 1000:.1f} ms" for t, name in timings[:5])
+        failed_line = f"\n**failed:** {', '.join(failures[:10])}" if failures else ""
+        
+        await status_msg.edit(content=f""" **bulk snapshot complete**
+
+**servers:** {len(timings):,} of {len(guilds):,}
+**elapsed:** {elapsed:.2f}s ({len(timings) / elapsed if elapsed > 0 else 0:,.1f} servers/s)
+**average per server:** {average_ms:.1f} ms{failed_line}
+
+**slowest servers:**
+{slowest or "• none"}""")
+
+    load_auto_snapshot_schedule()
+
     # Handle auto-snapshot functionality
     @bot.listen("on_message")
     async def auto_snapshot_handler(message):
-        # Only trigger on chance to prevent excessive checks
-        if random.random() > 0.05:  # Only run 5% of the time
-            return
-            
         # Skip if this is a DM or not in a guild
         if not message.guild:
             return
             
-        # Check if auto-snapshots are enabled for this guild
-        if not is_auto_snapshot_enabled(message.guild.id):
+        # O(1) in-memory check; no config or file access on the hot path
+        guild_id = message.guild.id
+        due = auto_snapshot_due.get(guild_id)
+        if due is None or time.time() < due:
             return
             
-        # Check if enough time has passed since last auto snapshot
-        if not should_take_auto_snapshot(message.guild.id):
-            return
+        # Block re-entry from concurrent messages until the schedule is refreshed
+        auto_snapshot_due[guild_id] = float("inf")
             
         # Take the snapshot silently
         try:
             await take_snapshot(message.guild, is_auto=True)
-            print(f"Auto-snapshot taken for {message.guild.name} (ID: {message.guild.id})", type_="INFO")
+            print(f"Auto-snapshot taken for {message.guild.name} (ID: {guild_id})", type_="INFO")
         except Exception as e:
-            print(f"Error taking auto-snapshot: {str(e)}", type_="ERROR")
+            # Back off instead of retrying on every message in the guild
+            failures = auto_snapshot_failures.get(guild_id, 0) + 1
+            auto_snapshot_failures[guild_id] = failures
+            delay = min(AUTO_SNAPSHOT_RETRY_SECONDS * 2 ** (failures - 1), AUTO_SNAPSHOT_RETRY_MAX_SECONDS)
+            auto_snapshot_due[guild_id] = time.time() + delay
+            print(f"Error taking auto-snapshot: {str(e)} (retrying in {delay // 60:.0f} min)", type_="ERROR")
+        else:
+            auto_snapshot_failures.pop(guild_id, None)
+            refresh_auto_snapshot_schedule(guild_id)
             
-    # Analyze member growth trends
-    def analyze_growth_trend(snapshots, days=7):
+    # Trend engine: works directly on the columnar epoch/member-count arrays
+    def get_member_series(guild_id):
+        """Return the guild's (times, counts) arrays; no timestamp parsing needed"""
+        snapshots = get_snapshots(guild_id)
+        return {"times": snapshots.timestamps, "counts": snapshots.columns["member_count"]}
+
+    def uses_daily_tier(guild_id, days):
+        """
+        Pick the storage tier for a query spanning `days`: raw snapshots for short
+        windows they cover, the daily rollup tier for long or older ranges.
+        """
+        times = get_snapshots(guild_id).timestamps
+        if days > LONG_RANGE_DAYS:
+            return True
+        if len(times) and times[0] <= times[-1] - days * 86400:
+            return False
+        return bool(get_rollups(guild_id))
+
+    def closest_index(times, target, hi=None):
+        """Binary search for the index in times[:hi] closest to target"""
+        hi = len(times) if hi is None else hi
+        i = bisect_left(times, target, 0, hi)
+        if i >= hi:
+            return hi - 1
+        if i > 0 and target - times[i - 1] <= times[i] - target:
+            return i - 1
+        return i
+
+    def prefix_sums(series):
+        """
+        Cumulative sums of t, c, t*t, t*c and c*c in one pass, with t in days and
+        c in members, both relative to the latest snapshot to keep precision.
+        Any window's least-squares fit is then O(1).
+        """
+        times = series["times"]
+        counts = series["counts"]
+        t_ref = times[-1]
+        c_ref = counts[-1]
+        sums = [(0.0, 0.0, 0.0, 0.0, 0.0)]
+        st = sc = stt = stc = scc = 0.0
+        for t, c in zip(times, counts):
+            t = (t - t_ref) / 86400
+            c = c - c_ref
+            st += t
+            sc += c
+            stt += t * t
+            stc += t * c
+            scc += c * c
+            sums.append((st, sc, stt, stc, scc))
+        return sums
+
+    def analyze_growth_trend(series, days=7, sums=None):
         """Analyze member growth trends and predict future growth"""
-        if len(snapshots) < 2:
+        times = series["times"]
+        counts = series["counts"]
+        n_total = len(times)
+        if n_total < 2:
             return {
                 "trend": "insufficient_data",
                 "growth_rate_daily": 0,
@@ -355,74 +1333,98 @@ def server_analytics():
                 "prediction_30_days": None,
                 "confidence": "low"
             }
+        if sums is None:
+            sums = prefix_sums(series)
             
-        # Sort snapshots by timestamp
-        sorted_snapshots = sorted(snapshots, key=lambda x: x["timestamp"])
-        
-        # Get the most recent snapshot
-        current = sorted_snapshots[-1]
-        current_time = datetime.fromisoformat(current["timestamp"])
-        current_count = current["member_count"]
-        
-        # Find a snapshot from approximately 'days' days ago
-        target_time = current_time - timedelta(days=days)
-        closest_snapshot = min(sorted_snapshots[:-1], 
-                              key=lambda x: abs(datetime.fromisoformat(x["timestamp"]) - target_time))
-        past_time = datetime.fromisoformat(closest_snapshot["timestamp"])
-        past_count = closest_snapshot["member_count"]
+        # The most recent snapshot and the one closest to 'days' days earlier
+        current_time = times[-1]
+        current_count = counts[-1]
+        start = closest_index(times, current_time - days * 86400, n_total - 1)
+        past_count = counts[start]
         
         # Calculate time difference in days
-        time_diff_days = (current_time - past_time).total_seconds() / (24 * 3600)
-        
-        # If time difference is too small, adjust analysis
-        if time_diff_days < 1:
-            time_diff_days = 1  # Minimum 1 day to avoid division issues
-            
-        # Calculate growth
+        time_diff_days = (current_time - times[start]) / 86400
         member_diff = current_count - past_count
-        growth_rate_daily = member_diff / time_diff_days
+        
+        # Least-squares fit over every snapshot in the window
+        n = n_total - start
+        st, sc, stt, stc, scc = (b - a for a, b in zip(sums[start], sums[n_total]))
+        sxx = stt - st * st / n
+        sxy = stc - st * sc / n
+        
+        if time_diff_days < 1 or sxx <= 0:
+            # Too short to fit; minimum 1 day to avoid division issues
+            growth_rate_daily = member_diff / max(time_diff_days, 1)
+            rate_margin = None
+        else:
+            growth_rate_daily = sxy / sxx
+            rate_margin = None
+            if n > 2:
+                residual = max(scc - sc * sc / n - growth_rate_daily * sxy, 0.0)
+                std_error = math.sqrt(residual / (n - 2) / sxx)
+                df = max(k for k in T_CRITICAL_95 if k <= n - 2)
+                rate_margin = T_CRITICAL_95[df] * std_error
         
         # Determine trend type
-        if member_diff > 0:
+        if abs(growth_rate_daily) * max(time_diff_days, 1) < 0.5:
+            trend = "stable"
+        elif growth_rate_daily > 0:
             if growth_rate_daily >= 10:
                 trend = "rapid_growth"
             elif growth_rate_daily >= 3:
                 trend = "steady_growth"
             else:
                 trend = "slow_growth"
-        elif member_diff < 0:
+        else:
             if growth_rate_daily <= -10:
                 trend = "rapid_decline"
             elif growth_rate_daily <= -3:
                 trend = "steady_decline"
             else:
                 trend = "slow_decline"
-        else:
-            trend = "stable"
             
         # Make predictions
         prediction_7_days = round(current_count + (growth_rate_daily * 7))
         prediction_30_days = round(current_count + (growth_rate_daily * 30))
         
-        # Determine confidence based on data points and consistency
-        # More snapshots and consistent growth pattern = higher confidence
-        if len(snapshots) >= 10:
-            confidence = "high"
-        elif len(snapshots) >= 5:
-            confidence = "medium"
-        else:
+        # Confidence comes from the width of the 95% interval on the daily rate
+        # relative to the rate itself (or one member/day for flat servers)
+        if rate_margin is None:
             confidence = "low"
+        else:
+            relative_margin = rate_margin / max(abs(growth_rate_daily), 1)
+            if n >= 5 and relative_margin <= 0.5:
+                confidence = "high"
+            elif relative_margin <= 1.5:
+                confidence = "medium"
+            else:
+                confidence = "low"
             
         return {
             "trend": trend,
             "growth_rate_daily": growth_rate_daily,
+            "growth_rate_margin": rate_margin,
             "growth_total": member_diff,
             "days_measured": round(time_diff_days, 1),
+            "data_points": n,
             "prediction_7_days": prediction_7_days,
             "prediction_30_days": prediction_30_days,
+            "prediction_7_days_margin": round(rate_margin * 7) if rate_margin is not None else None,
+            "prediction_30_days_margin": round(rate_margin * 30) if rate_margin is not None else None,
             "confidence": confidence
         }
 
+    def analyze_trends(series, windows=(3, 7, 14)):
+        """Analyze several windows sharing a single pass over the series"""
+        sums = prefix_sums(series) if len(series["times"]) >= 2 else None
+        return {days: analyze_growth_trend(series, days, sums) for days in windows}
+
+    def format_margin(margin, suffix=""):
+        """Render a ± confidence margin, or nothing if there isn't enough data"""
+        if margin is None:
+            return ""
+        return f" (±{margin:,.1f}{suffix})" if isinstance(margin, float) else f" (±{margin:,}{suffix})"
+
     # Commands
     @bot.command(name="analytics", description="Server analytics commands")
     async def analytics_cmd(ctx, *, args: str = ""):
@@ -441,7 +1443,10 @@ def server_analytics():
         cmd = parts[0] if parts else ""
         subcmd = parts[1] if len(parts) > 1 else ""
         
-        if cmd == "snapshot":
+        if cmd == "snapshot" and subcmd == "all":
+            await snapshot_all_guilds(ctx)
+            
+        elif cmd == "snapshot":
             snapshot = await take_snapshot(ctx.guild)
             await ctx.send(f""" **New Snapshot**
             
@@ -455,6 +1460,9 @@ def server_analytics():
             
         elif cmd == "clear":
             initialize_data(ctx.guild.id)
+            async with guild_locks[ctx.guild.id]:
+                clear_snapshots(ctx.guild.id)
+                index_guild(ctx.guild.id, ctx.guild.name)
             await ctx.send(f"analytics data for {ctx.guild.name} has been cleared.")
             
         elif cmd == "status":
@@ -474,14 +1482,22 @@ def server_analytics():
             await compare_periods(ctx, days)
             
         elif cmd == "export":
-            await export_data(ctx)
+            await export_data(ctx, parts[1:])
+            
+        elif cmd == "fleet" and subcmd == "rebuild":
+            await rebuild_fleet_index(ctx)
+            
+        elif cmd == "fleet":
+            await show_fleet(ctx, parts[1:])
 
         elif cmd == "auto":
             if subcmd in ["on", "true", "yes", "enable", "1"]:
                 update_server_config(ctx.guild.id, "auto_snapshot", True)
+                refresh_auto_snapshot_schedule(ctx.guild.id)
                 await ctx.send("automatic daily snapshots enabled")
             elif subcmd in ["off", "false", "no", "disable", "0"]:
                 update_server_config(ctx.guild.id, "auto_snapshot", False)
+                refresh_auto_snapshot_schedule(ctx.guild.id)
                 await ctx.send("automatic daily snapshots disabled")
             else:
                 is_enabled = is_auto_snapshot_enabled(ctx.guild.id)
@@ -497,6 +1513,7 @@ use `<p>analytics auto off` to disable""")
             if subcmd.isdigit():
                 days = int(subcmd)
                 update_server_config(ctx.guild.id, "snapshot_retention_days", days)
+                schedule_compaction(ctx.guild.id, force=True)
                 await ctx.send(f"data retention set to {days} days")
             else:
                 current = load_server_config(ctx.guild.id).get(
@@ -511,6 +1528,7 @@ use `<p>analytics auto off` to disable""")
                     update_server_config(
                         ctx.guild.id, "auto_snapshot_interval_hours", hours
                     )
+                    refresh_auto_snapshot_schedule(ctx.guild.id)
                     await ctx.send(
                         f"automatic snapshot interval set to {hours} hours"
                     )
@@ -524,21 +1542,47 @@ use `<p>analytics auto off` to disable""")
                 await ctx.send(
                     f"automatic snapshot interval is {current} hours"
                 )
+
+        elif cmd == "recount":
+            counters = recount_guild(ctx.guild)
+            await ctx.send(f"""recounted **{ctx.guild.name}**: {counters["bots"]:,} bots, {counters["text_channels"]:,} text, {counters["voice_channels"]:,} voice, {counters["categories"]:,} categories""")
+
+        elif cmd == "storage":
+            if subcmd in STORAGE_FORMATS:
+                async with guild_locks[ctx.guild.id]:
+                    await flush_writes()
+                    count = convert_storage_format(ctx.guild.id, subcmd)
+                await ctx.send(f"snapshot storage set to **{subcmd}** ({count:,} snapshots converted)")
+            else:
+                current = load_server_config(ctx.guild.id).get("storage_format", "jsonl")
+                await ctx.send(f"snapshot storage format is **{current}** (options: {', '.join(STORAGE_FORMATS)})")
+            
+        elif cmd == "chart":
+            if subcmd in CHART_STYLES:
+                update_server_config(ctx.guild.id, "chart_style", subcmd)
+                await ctx.send(f"member history style set to **{subcmd}**")
+            else:
+                current = load_server_config(ctx.guild.id).get("chart_style", "image")
+                await ctx.send(f"member history style is **{current}** (options: {', '.join(CHART_STYLES)})")
             
         else:
             await ctx.send(""" **server analytics commands**
 
-• `<p>analytics snapshot` - take a snapshot
+• `<p>analytics snapshot [all]` - take a snapshot (all = every server)
 • `<p>analytics report` - generate detailed report
 • `<p>analytics clear` - clear data
 • `<p>analytics status` - show collection status
 • `<p>analytics members` - show recent member changes
 • `<p>analytics trend` - show growth trend analysis
 • `<p>analytics compare [days]` - compare with previous period
-• `<p>analytics export` - export data to text file
+• `<p>analytics export [days] [from:date] [to:date] [cols:a,b] [gz]` - export data to csv
 • `<p>analytics auto [on/off]` - manage automatic snapshots
 • `<p>analytics retention [days]` - set data retention period
 • `<p>analytics interval [hours]` - set auto snapshot interval
+• `<p>analytics storage [jsonl/binary]` - set snapshot storage format
+• `<p>analytics chart [image/emoji/text]` - set member history style
+• `<p>analytics recount` - rebuild bot/channel counters
+• `<p>analytics fleet [sort] [7d/30d] [count]` - rank every tracked server
 • `<p>a <subcommand>` - shorthand for commands
 • `<p>a ss` - quick snapshot
 • `<p>a timezone <zone>` - set timezone""")
@@ -559,6 +1603,10 @@ use `<p>analytics auto off` to disable""")
         cmd = parts[0] if parts else ""
         
         # Handle the "ss" shorthand for snapshot
+        if cmd == "ss" and len(parts) > 1 and parts[1] == "all":
+            await snapshot_all_guilds(ctx)
+            return
+            
         if cmd == "ss":
             snapshot = await take_snapshot(ctx.guild)
             await ctx.send(f""" **new snapshot**
@@ -566,30 +1614,37 @@ use `<p>analytics auto off` to disable""")
 **server**: {ctx.guild.name}
 **members**: {snapshot["member_count"]:,}
 **channels**: {snapshot["channel_count"]:,}
-**time**: {format_time_in_timezone(datetime.fromisoformat(snapshot["timestamp"]), "%h:%m:%s")}""")
+**time**: {format_time_in_timezone(datetime.fromisoformat(snapshot["timestamp"]), "%H:%M:%S")}""")
             return
             
         # Handle timezone setting
         if cmd == "timezone":
-            timezone = " ".join(parts[1:]).strip().upper() if len(parts) > 1 else ""
+            timezone = " ".join(parts[1:]).strip() if len(parts) > 1 else ""
             
             if not timezone:
                 current_tz = get_timezone()
-                await ctx.send(f"current timezone is set to **{current_tz}**")
+                await ctx.send(f"current timezone is set to **{current_tz}** ({zone_key(resolve_timezone())})")
                 return
                 
             # Validate timezone
-            if timezone in TIMEZONE_OFFSETS:
-                updateConfigData(TIMEZONE_CONFIG_KEY, timezone)
-                await ctx.send(f"timezone set to **{timezone}**")
+            zone = lookup_zone(timezone)
+            if zone is not None:
+                name = timezone.upper() if timezone.upper() in TIMEZONE_ALIASES else zone_key(zone)
+                updateConfigData(TIMEZONE_CONFIG_KEY, name)
+                await ctx.send(f"timezone set to **{name}** ({zone_key(zone)})")
             else:
                 # Show available timezones
-                timezone_list = ", ".join(sorted(TIMEZONE_OFFSETS.keys()))
+                timezone_list = ", ".join(sorted(TIMEZONE_ALIASES.keys()))
+                iana_note = "any IANA zone name also works, e.g. Europe/Berlin or America/Sao_Paulo"
+                if not iana_names and not available_timezones():
+                    iana_note = "IANA zone names need a time zone database: run `pip install tzdata`"
                 await ctx.send(f""" invalid timezone: **{timezone}**
 
-available timezones:
+available abbreviations:
 {timezone_list}
 
+{iana_note}
+
 usage: `<p>a timezone <zone>`""")
             return
             
@@ -598,17 +1653,20 @@ usage: `<p>a timezone <zone>`""")
 
     # Show analytics status
     async def show_status(ctx):
-        files = get_server_files(ctx.guild.id)
-        data = load_data(files['snapshots'])
-        snapshots = data.get("snapshots", [])
         config = load_server_config(ctx.guild.id)
         
+        # Aggregate straight from the columns; only the latest row becomes a dict
+        snapshots = get_snapshots(ctx.guild.id)
+        total_count = len(snapshots)
+        auto_count = sum(snapshots.columns["is_auto"])
+        latest = snapshots.row(-1) if total_count else None
+        
         # Save current private setting and update it
         current_private = getConfigData().get("private")
         updateConfigData("private", False)
         
         try:
-            if not snapshots:
+            if not total_count:
                 await forwardEmbedMethod(
                     channel_id=ctx.channel.id,
                     content="no analytics data available yet for this server.",
@@ -616,35 +1674,33 @@ usage: `<p>a timezone <zone>`""")
                     image=None
                 )
             else:
-                latest = snapshots[-1]
-                latest_time = format_time_in_timezone(datetime.fromisoformat(latest["timestamp"]), "%y-%m-%d %h:%m")
+                latest_time = format_time_in_timezone(datetime.fromisoformat(latest["timestamp"]), "%Y-%m-%d %H:%M")
                 
                 # Count auto snapshots
-                auto_count = len([s for s in snapshots if s.get("is_auto", False)])
-                manual_count = len(snapshots) - auto_count
+                manual_count = total_count - auto_count
                 
                 # Auto snapshot status
                 auto_status = "enabled" if config.get("auto_snapshot", False) else "disabled"
                 
                 # Calculate average daily snapshots
-                if len(snapshots) >= 2:
-                    first_snapshot = min(snapshots, key=lambda x: x["timestamp"])
-                    first_time = datetime.fromisoformat(first_snapshot["timestamp"])
+                if total_count >= 2:
+                    first_time = EPOCH + timedelta(seconds=snapshots.timestamps[0])
                     time_span = (datetime.utcnow() - first_time).total_seconds() / (24 * 3600)
                     if time_span > 0:
-                        avg_daily = len(snapshots) / time_span
+                        avg_daily = total_count / time_span
                     else:
-                        avg_daily = len(snapshots)
+                        avg_daily = total_count
                 else:
-                    avg_daily = len(snapshots)
+                    avg_daily = total_count
                 
-                status_content = f"""**total snapshots**: {len(snapshots):,} ({manual_count:,} manual, {auto_count:,} automatic)
+                status_content = f"""**total snapshots**: {total_count:,} ({manual_count:,} manual, {auto_count:,} automatic)
 **last update**: {latest_time}
 **members tracked**: {latest["member_count"]:,}
 **auto-snapshots**: {auto_status}
 **average**: {avg_daily:.1f} snapshots per day
+**daily rollups**: {len(get_rollups(ctx.guild.id)):,} days
 
-*data is retained for {config.get("snapshot_retention_days", DATA_RETENTION_DAYS)} days*"""
+*raw snapshots are retained for {config.get("snapshot_retention_days", DATA_RETENTION_DAYS)} days, daily rollups for {config.get("rollup_retention_days", ROLLUP_RETENTION_DAYS)} days*"""
                 
                 await forwardEmbedMethod(
                     channel_id=ctx.channel.id,
@@ -658,13 +1714,12 @@ usage: `<p>a timezone <zone>`""")
 
     # Generate analytics report
     async def generate_report(ctx):
-        files = get_server_files(ctx.guild.id)
         initialize_data(ctx.guild.id)  # Ensure files exist
         
-        data = load_data(files['snapshots'])
-        snapshots = data.get("snapshots", [])
+        # Only the first and latest rows are materialized; the peak comes from the column
+        snapshots = get_snapshots(ctx.guild.id)
         
-        if not snapshots:
+        if not len(snapshots):
             # Save current private setting and update it
             current_private = getConfigData().get("private")
             updateConfigData("private", False)
@@ -681,19 +1736,24 @@ usage: `<p>a timezone <zone>`""")
                 updateConfigData("private", current_private)
             return
             
-        # Calculate basic statistics
-        latest = snapshots[-1]
-        oldest = snapshots[0]
+        # Calculate basic statistics; once snapshots have been rolled up the daily
+        # tier supplies the start of history and the all-time peak
+        latest = snapshots.row(-1)
+        if get_rollups(ctx.guild.id):
+            daily_rows = get_daily_rows(ctx.guild.id)
+            oldest = daily_rows[0]
+            peak_members = max(row["member_max"] for row in daily_rows)
+        else:
+            oldest = snapshots.row(0)
+            peak_members = max(snapshots.columns["member_count"])
         growth = latest["member_count"] - oldest["member_count"]
         growth_rate = (growth / oldest["member_count"]) * 100 if oldest["member_count"] > 0 else 0
         
-        # Find peak member count in the dataset
-        peak_members = max(s["member_count"] for s in snapshots)
         current_members = latest["member_count"]
         members_from_peak = current_members - peak_members
         
         # Get trend analysis
-        trend_data = analyze_growth_trend(snapshots)
+        trend_data = analyze_growth_trend(get_member_series(ctx.guild.id))
         
         # Format growth rate for display
         daily_change = trend_data["growth_rate_daily"]
@@ -744,13 +1804,13 @@ usage: `<p>a timezone <zone>`""")
 
 **growth analysis**
 • current trend: **{trend_data["trend"].replace("_", " ").title()}**
-• daily change: **{daily_growth_display}** members/day
+• daily change: **{daily_growth_display}**{format_margin(trend_data.get("growth_rate_margin"))} members/day
 • member growth: **{growth:+,}** members total
 • growth rate: **{growth_rate:,.2f}%**
 • next milestone: **{next_milestone:,}** members
 • est. days to milestone: **{days_to_milestone}** days
 
-*last updated: {format_time_in_timezone(datetime.fromisoformat(latest["timestamp"]), "%y-%m-%d %h:%m")}*
+*last updated: {format_time_in_timezone(datetime.fromisoformat(latest["timestamp"]), "%Y-%m-%d %H:%M")}*
 server analytics
 """
             
@@ -771,16 +1831,15 @@ server analytics
             
     # Show trend analysis
     async def show_trend_analysis(ctx):
-        files = get_server_files(ctx.guild.id)
-        data = load_data(files['snapshots'])
-        snapshots = data.get("snapshots", [])
+        # Only timestamps and member counts are needed for trend analysis
+        series = get_member_series(ctx.guild.id)
         
         # Save current private setting and update it
         current_private = getConfigData().get("private")
         updateConfigData("private", False)
         
         try:
-            if len(snapshots) < 2:
+            if len(series["times"]) < 2:
                 await forwardEmbedMethod(
                     channel_id=ctx.channel.id,
                     content="not enough data for trend analysis. please take at least 2 snapshots.",
@@ -789,35 +1848,54 @@ server analytics
                 )
                 return
                 
-            # Get trend analysis for different time periods
-            short_trend = analyze_growth_trend(snapshots, days=3)
-            medium_trend = analyze_growth_trend(snapshots, days=7)
-            long_trend = analyze_growth_trend(snapshots, days=14)
+            # Get trend analysis for different time periods, one pass per tier
+            windows = (3, 7, 14)
+            daily_windows = tuple(days for days in windows if uses_daily_tier(ctx.guild.id, days))
+            daily_series = get_daily_series(ctx.guild.id)
+            trends = analyze_trends(series, tuple(days for days in windows if days not in daily_windows))
+            
+            # Long-range windows come from the daily tier, shown once history covers them
+            daily_times = daily_series["times"]
+            span_days = (daily_times[-1] - daily_times[0]) / 86400 if len(daily_times) else 0
+            long_range_windows = tuple(days for days in (30, 90, 365) if span_days >= days * 0.9)
+            if len(daily_times) >= 2:
+                trends.update(analyze_trends(daily_series, daily_windows + long_range_windows))
+            short_trend = trends.get(3) or analyze_growth_trend(series, 3)
+            medium_trend = trends.get(7) or analyze_growth_trend(series, 7)
+            long_trend = trends.get(14) or analyze_growth_trend(series, 14)
+            
+            long_range_lines = "".join(
+                f"• {days}-day: **{trends[days]['growth_total']:+,}** members, "
+                f"**{trends[days]['growth_rate_daily']:.1f}**{format_margin(trends[days]['growth_rate_margin'])} members/day\n"
+                for days in long_range_windows
+            )
+            long_range_section = f"\n**long-range history (daily rollups)**\n{long_range_lines}" if long_range_lines else ""
             
             # Format the trend analysis
-            latest = max(snapshots, key=lambda x: x["timestamp"])
-            current_members = latest["member_count"]
+            current_members = series["counts"][-1]
+            latest_time = EPOCH + timedelta(seconds=series["times"][-1])
             
             trend_content = f"""## member growth analysis
 
 **current members:** {current_members:,}
 
 **short-term trend:** {short_trend["trend"].replace("_", " ").title()}
-• daily change: **{short_trend["growth_rate_daily"]:.1f}** members/day
-• 7-day projection: **{short_trend["prediction_7_days"]:,}** members
+• daily change: **{short_trend["growth_rate_daily"]:.1f}**{format_margin(short_trend["growth_rate_margin"])} members/day
+• 7-day projection: **{short_trend["prediction_7_days"]:,}**{format_margin(short_trend["prediction_7_days_margin"])} members
 • confidence: {short_trend["confidence"].title()}
 
 **medium-term trend:** {medium_trend["trend"].replace("_", " ").title()}
-• daily change: **{medium_trend["growth_rate_daily"]:.1f}** members/day
-• 30-day projection: **{medium_trend["prediction_30_days"]:,}** members
+• daily change: **{medium_trend["growth_rate_daily"]:.1f}**{format_margin(medium_trend["growth_rate_margin"])} members/day
+• 30-day projection: **{medium_trend["prediction_30_days"]:,}**{format_margin(medium_trend["prediction_30_days_margin"])} members
 • confidence: {medium_trend["confidence"].title()}
 
 **long-term trend:** {long_trend["trend"].replace("_", " ").title()}
-• over {long_trend["days_measured"]} days
+• over {long_trend["days_measured"]} days ({long_trend["data_points"]} snapshots)
 • total change: **{long_trend["growth_total"]:+,}** members
-
-*note: projections are estimates based on current trends*
-*last updated: {format_time_in_timezone(datetime.fromisoformat(latest["timestamp"]), "%y-%m-%d %h:%m")}*
+• daily change: **{long_trend["growth_rate_daily"]:.1f}**{format_margin(long_trend["growth_rate_margin"])} members/day
+{long_range_section}
+*note: rates are least-squares fits over each window; ± values are 95% confidence intervals*
+*last updated: {format_time_in_timezone(latest_time, "%Y-%m-%d %H:%M")}*
 """
             
             await forwardEmbedMethod(
@@ -835,9 +1913,7 @@ server analytics
             
     # Compare server stats between time periods
     async def compare_periods(ctx, days=7):
-        files = get_server_files(ctx.guild.id)
-        data = load_data(files['snapshots'])
-        snapshots = data.get("snapshots", [])
+        snapshots = get_snapshots(ctx.guild.id)
         
         # Save current private setting and update it
         current_private = getConfigData().get("private")
@@ -853,18 +1929,24 @@ server analytics
                 )
                 return
                 
-            # Sort snapshots by timestamp
-            sorted_snapshots = sorted(snapshots, key=lambda x: x["timestamp"])
-            
-            # Get the most recent snapshot
-            current = sorted_snapshots[-1]
+            # Columns are chronological; get the most recent snapshot
+            times = snapshots.timestamps
+            current = snapshots.row(-1)
             current_time = datetime.fromisoformat(current["timestamp"])
             
-            # Find a snapshot from approximately 'days' days ago
-            target_time = current_time - timedelta(days=days)
-            previous = min(sorted_snapshots[:-1], 
-                           key=lambda x: abs(datetime.fromisoformat(x["timestamp"]) - target_time))
-            previous_time = datetime.fromisoformat(previous["timestamp"])
+            # Find a snapshot from approximately 'days' days ago, reading the daily
+            # rollup tier when the range is long or older than the raw snapshots
+            target = times[-1] - days * 86400
+            daily_rows = get_daily_rows(ctx.guild.id) if uses_daily_tier(ctx.guild.id, days) else []
+            if daily_rows and daily_rows[0]["last_ts"] < times[0]:
+                day_times = [row["last_ts"] for row in daily_rows]
+                previous = daily_rows[closest_index(day_times, target, len(day_times) - 1)]
+                previous_time = datetime.fromisoformat(previous["timestamp"])
+                tier_note = " (daily rollup)"
+            else:
+                previous = snapshots.row(closest_index(times, target, len(times) - 1))
+                previous_time = datetime.fromisoformat(previous["timestamp"])
+                tier_note = ""
             
             # Calculate actual days between snapshots
             days_diff = (current_time - previous_time).total_seconds() / (24 * 3600)
@@ -877,14 +1959,15 @@ server analytics
             role_diff = current["role_count"] - previous["role_count"]
             
             # Format dates
-            current_date = format_time_in_timezone(current_time, "%y-%m-%d %h:%m")
-            previous_date = format_time_in_timezone(previous_time, "%y-%m-%d %h:%m")
+            format_date = get_time_formatter(resolve_timezone(), "%Y-%m-%d %H:%M")
+            current_date = format_date(current_time)
+            previous_date = format_date(previous_time)
             
             # Build comparison message
             comparison = f"""## server comparison
 
 **time period:** {days_diff:.1f} days
-**from:** {previous_date}
+**from:** {previous_date}{tier_note}
 **to:** {current_date}
 
 **member changes**
@@ -917,55 +2000,186 @@ server analytics
             # Always restore private setting
             updateConfigData("private", current_private)
             
-    # Export analytics data to text file
-    async def export_data(ctx):
-        files = get_server_files(ctx.guild.id)
-        data = load_data(files['snapshots'])
-        snapshots = data.get("snapshots", [])
+    def parse_export_options(tokens):
+        """Parse export options into (start, end, columns, compress); raises ValueError"""
+        start = None
+        end = None
+        columns = list(DEFAULT_EXPORT_COLUMNS)
+        compress = False
+        for token in tokens:
+            if token.isdigit():
+                start = (datetime.utcnow() - timedelta(days=int(token)) - EPOCH).total_seconds()
+            elif token.startswith("from:"):
+                start = iso_to_epoch(token[5:])
+            elif token.startswith("to:"):
+                # Include the whole end day
+                end = iso_to_epoch(token[3:]) + 86400
+            elif token.startswith("cols:"):
+                requested = [c for c in token[5:].split(",") if c]
+                unknown = [c for c in requested if c not in EXPORT_COLUMNS]
+                if unknown:
+                    raise ValueError(f"unknown column(s): {', '.join(unknown)}")
+                columns = ["timestamp"] + [c for c in requested if c != "timestamp"]
+            elif token in ("gz", "gzip"):
+                compress = True
+            else:
+                raise ValueError(f"unknown export option: {token}")
+        return start, end, columns, compress
+
+    def write_csv_export(export_path, header_lines, columns, compress):
+        """Stream column slices to a CSV file in batches (blocking; run in a worker thread)"""
+        opener = gzip.open if compress else open
+        row_count = len(columns["timestamp"])
+        with opener(export_path, "wt", newline="") as f:
+            for line in header_lines:
+                f.write(line + "\n")
+            writer = csv.writer(f)
+            writer.writerow(list(columns))
+            
+            values = list(columns.values())
+            for batch_start in range(0, row_count, EXPORT_BATCH_ROWS):
+                batch_end = min(batch_start + EXPORT_BATCH_ROWS, row_count)
+                writer.writerows(
+                    [
+                        epoch_to_iso(column[i]) if name == "timestamp"
+                        else bool(column[i]) if name == "is_auto"
+                        else column[i]
+                        for name, column in zip(columns, values)
+                    ]
+                    for i in range(batch_start, batch_end)
+                )
+        return row_count
+
+    # Cross-guild queries answered from the fleet index
+    def parse_fleet_options(tokens):
+        """Parse fleet options into (sort, window days, limit); raises ValueError"""
+        sort = "growth"
+        days = FLEET_WINDOWS[0]
+        limit = FLEET_DEFAULT_LIMIT
+        for token in tokens:
+            if token in ("growth", "shrinking", "percent", "members", "stale"):
+                sort = token
+            elif token.endswith("d") and token[:-1].isdigit():
+                days = int(token[:-1])
+                if days not in FLEET_WINDOWS:
+                    raise ValueError(f"window must be one of: {', '.join(f'{d}d' for d in FLEET_WINDOWS)}")
+            elif token.isdigit() and int(token) > 0:
+                limit = min(int(token), 25)
+            else:
+                raise ValueError(f"unknown fleet option: {token}")
+        return sort, days, limit
+
+    def fleet_growth_percent(entry, days):
+        base = entry["member_count"] - entry[f"growth_{days}d"]
+        return entry[f"growth_{days}d"] / base * 100 if base > 0 else 0.0
+
+    async def show_fleet(ctx, options):
+        try:
+            sort, days, limit = parse_fleet_options(options)
+        except ValueError as e:
+            await ctx.send(f"{e}. usage: `<p>analytics fleet [growth/shrinking/percent/members/stale] [7d/30d] [count]`")
+            return
+            
+        entries = list(get_fleet_index().values())
+        if not entries:
+            await ctx.send("the fleet index is empty. take snapshots or run `<p>analytics fleet rebuild`.")
+            return
+            
+        # Partial selection: O(n log k) over the index entries
+        growth_key = f"growth_{days}d"
+        if sort == "growth":
+            top = heapq.nlargest(limit, entries, key=lambda e: e.get(growth_key, 0))
+            title = f"top {limit} servers by {days}-day growth"
+        elif sort == "shrinking":
+            top = heapq.nsmallest(limit, entries, key=lambda e: e.get(growth_key, 0))
+            title = f"top {limit} shrinking servers over {days} days"
+        elif sort == "percent":
+            top = heapq.nlargest(limit, entries, key=lambda e: fleet_growth_percent(e, days))
+            title = f"top {limit} servers by {days}-day growth rate"
+        elif sort == "members":
+            top = heapq.nlargest(limit, entries, key=lambda e: e["member_count"])
+            title = f"top {limit} servers by members"
+        else:
+            top = heapq.nsmallest(limit, entries, key=lambda e: e["last_snapshot"])
+            title = f"{limit} servers with the oldest snapshots"
+        
+        format_date = get_time_formatter(resolve_timezone(), "%b %d, %I:%M %p")
+        now = (datetime.utcnow() - EPOCH).total_seconds()
+        lines = []
+        for rank, entry in enumerate(top, 1):
+            growth = entry.get(growth_key, 0)
+            line = (f"{rank}. **{entry['name'][:40]}** — **{growth:+,}** ({fleet_growth_percent(entry, days):+.1f}%)"
+                    f" · {entry['member_count']:,} members")
+            span = entry.get(f"span_{days}d", 0)
+            if span < days * 0.9:
+                line += f" · {span:.1f}d of data"
+            if sort == "stale" or now - entry["last_snapshot"] > 2 * 86400:
+                line += f" · last snapshot {format_date(EPOCH + timedelta(seconds=entry['last_snapshot']))}"
+            lines.append(line)
+        
+        content = "\n".join(lines) + f"\n\n*{len(entries):,} servers tracked · growth is measured at each server's latest snapshot*"
+        
+        # Save current private setting and update it
+        current_private = getConfigData().get("private")
+        updateConfigData("private", False)
         
-        if not snapshots:
+        try:
+            await forwardEmbedMethod(
+                channel_id=ctx.channel.id,
+                content=content,
+                title=f"analytics fleet: {title}",
+                image=None
+            )
+        finally:
+            # Always restore private setting
+            updateConfigData("private", current_private)
+
+    # Export analytics data to a CSV file
+    async def export_data(ctx, options=()):
+        try:
+            start, end, column_names, compress = parse_export_options(options)
+        except ValueError as e:
+            await ctx.send(f"{e}\nusage: `<p>analytics export [days] [from:YYYY-MM-DD] [to:YYYY-MM-DD] [cols:{','.join(EXPORT_COLUMNS[1:])}] [gz]`")
+            return
+            
+        snapshots = get_snapshots(ctx.guild.id)
+        
+        # Select the date range by binary search; columns are chronological
+        first = bisect_left(snapshots.timestamps, start) if start is not None else 0
+        last = bisect_right(snapshots.timestamps, end) if end is not None else len(snapshots)
+        
+        if first >= last:
             await ctx.send("no analytics data available to export.")
             return
             
         try:
-            # Sort snapshots chronologically
-            sorted_snapshots = sorted(snapshots, key=lambda x: x["timestamp"])
-            
-            # Create a formatted text file
-            export_text = f"# server analytics export - {ctx.guild.name}\n"
-            export_text += f"# generated on {datetime.utcnow().strftime('%y-%m-%d %h:%m:%s')} utc\n"
-            export_text += f"# total snapshots: {len(snapshots)}\n\n"
-            
-            export_text += "timestamp,member_count,channel_count,text_channels,voice_channels,categories,role_count,bots\n"
-            
-            for snapshot in sorted_snapshots:
-                timestamp = snapshot["timestamp"]
-                member_count = snapshot["member_count"]
-                channel_count = snapshot["channel_count"]
-                text_channels = snapshot.get("text_channels", 0)
-                voice_channels = snapshot.get("voice_channels", 0)
-                categories = snapshot.get("categories", 0)
-                role_count = snapshot["role_count"]
-                bots = snapshot.get("bots", 0)
-                
-                export_text += f"{timestamp},{member_count},{channel_count},{text_channels},{voice_channels},{categories},{role_count},{bots}\n"
-                
             # Create a temporary file in the exports directory
             export_dir = Path(getScriptsPath()) / "exports"
             export_dir.mkdir(parents=True, exist_ok=True)
             
-            filename = f"{ctx.guild.id}_analytics_{datetime.utcnow().strftime('%y%m%d_%h%m%S')}.csv"
+            filename = f"{ctx.guild.id}_analytics_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}.csv"
+            if compress:
+                filename += ".gz"
             export_path = export_dir / filename
             
-            with open(export_path, "w") as f:
-                f.write(export_text)
+            # Copy the selected slices now so later appends or pruning can't shift rows mid-export
+            columns = {name: snapshots.columns[name][first:last] for name in column_names}
+            header_lines = [
+                f"# server analytics export - {ctx.guild.name}",
+                f"# generated on {datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S')} utc",
+                f"# total snapshots: {last - first}",
+                "",
+            ]
+            
+            row_count = await run_in_thread(write_csv_export, export_path, header_lines, columns, compress)
                 
             await ctx.send(f""" **analytics data export complete**
 
 **file:** `{filename}`
 **location:** `{export_path}`
-**snapshots:** {len(snapshots)}
-**format:** csv (comma-separated values)
+**snapshots:** {row_count:,}
+**columns:** {", ".join(column_names)}
+**format:** csv (comma-separated values){" gzip-compressed" if compress else ""}
 
 *use your file manager to access the exported data*""")
             
@@ -973,20 +2187,137 @@ server analytics
             print(f"error exporting data: {str(e)}", type_="error")
             await ctx.send(f"error exporting analytics data. please try again later.")
 
+    # Member chart rendering: a palette PNG built column by column in pure Python
+    def chart_series(guild_id):
+        """
+        Points to plot as (times, lows, highs): daily rollups older than the raw
+        log (as their min/max range), then every raw snapshot.
+        """
+        snapshots = get_snapshots(guild_id)
+        counts = list(snapshots.columns["member_count"])
+        first = snapshots.timestamps[0] if len(snapshots) else float("inf")
+        older = [row for row in get_daily_rows(guild_id) if row["last_ts"] < first] if get_rollups(guild_id) else []
+        return (
+            [row["last_ts"] for row in older] + list(snapshots.timestamps),
+            [row["member_min"] for row in older] + counts,
+            [row["member_max"] for row in older] + counts,
+        )
+
+    def png_chunk(tag, data):
+        return struct.pack(">I", len(data)) + tag + data + struct.pack(">I", zlib.crc32(tag + data))
+
+    def render_member_chart(times, lows, highs, width=CHART_WIDTH, height=CHART_HEIGHT):
+        """
+        Render member counts as a line chart PNG. Points are downsampled to one
+        min/max span per pixel column, so cost depends on the pixel width rather
+        than the number of snapshots.
+        """
+        plot_width = width - 2 * CHART_MARGIN
+        plot_height = height - 2 * CHART_MARGIN
+        start = times[0]
+        span = (times[-1] - start) or 1
+        low = min(lows)
+        high = max(highs)
+        if low == high:
+            low -= 1
+            high += 1
+        scale = (plot_height - 1) / (high - low)
+        
+        # Bucket points into pixel columns: [top y, bottom y, first y, last y]
+        points = {}
+        for timestamp, member_min, member_max in zip(times, lows, highs):
+            x = int((timestamp - start) / span * (plot_width - 1))
+            top = round((high - member_max) * scale)
+            bottom = round((high - member_min) * scale)
+            middle = (top + bottom) // 2
+            column = points.get(x)
+            if column is None:
+                points[x] = [top, bottom, middle, middle]
+            else:
+                column[0] = min(column[0], top)
+                column[1] = max(column[1], bottom)
+                column[3] = middle
+        
+        # Connect neighbouring columns, interpolating across empty ones
+        tops = [plot_height] * plot_width
+        bottoms = [-1] * plot_width
+        previous = None
+        for x in sorted(points):
+            top, bottom, first, last = points[x]
+            if previous is not None:
+                previous_x, previous_y = previous
+                step = (first - previous_y) / (x - previous_x)
+                for gap in range(previous_x + 1, x + 1):
+                    a = round(previous_y + step * (gap - 1 - previous_x))
+                    b = round(previous_y + step * (gap - previous_x))
+                    tops[gap] = min(tops[gap], a, b)
+                    bottoms[gap] = max(bottoms[gap], a, b)
+            tops[x] = min(tops[x], top)
+            bottoms[x] = max(bottoms[x], bottom)
+            previous = (x, last)
+        
+        # Each pixel column is three byte runs: background, line, filled area
+        grid_rows = {CHART_MARGIN + round(i * (plot_height - 1) / CHART_GRID_LINES) for i in range(CHART_GRID_LINES + 1)}
+        plot_rows = range(CHART_MARGIN, CHART_MARGIN + plot_height)
+        margin_column = bytes([CHART_BACKGROUND]) * height
+        empty_column = bytes(CHART_GRID if y in grid_rows else CHART_BACKGROUND for y in range(height))
+        fill_column = bytes(
+            (CHART_FILL_GRID if y in grid_rows else CHART_FILL) if y in plot_rows else CHART_BACKGROUND
+            for y in range(height)
+        )
+        line = bytes([CHART_LINE])
+        columns = [margin_column] * CHART_MARGIN
+        for x in range(plot_width):
+            if bottoms[x] < 0:
+                columns.append(empty_column)
+                continue
+            top = CHART_MARGIN + tops[x] - 1  # 2px line
+            bottom = CHART_MARGIN + bottoms[x] + 1
+            columns.append(empty_column[:top] + line * (bottom - top) + fill_column[bottom:])
+        columns.extend([margin_column] * CHART_MARGIN)
+        
+        # The buffer is column-major, so every image row is a strided slice of it
+        pixels = b"".join(columns)
+        raw = b"".join(b"\x00" + pixels[y::height] for y in range(height))
+        return (
+            b"\x89PNG\r\n\x1a\n"
+            + png_chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 3, 0, 0, 0))
+            + png_chunk(b"PLTE", CHART_PALETTE)
+            + png_chunk(b"IDAT", zlib.compress(raw, 6))
+            + png_chunk(b"IEND", b"")
+        )
+
+    async def get_member_chart(guild_id):
+        """Chart PNG and its ranges, cached until new snapshots or rollups arrive"""
+        snapshots = get_snapshots(guild_id)
+        key = (len(snapshots), snapshots.timestamps[-1], snapshots.timestamps[0], len(get_rollups(guild_id)))
+        cached = chart_cache.get(guild_id)
+        if cached is not None and cached[0] == key:
+            return cached[1]
+            
+        times, lows, highs = chart_series(guild_id)
+        chart = {
+            "png": await run_in_thread(render_member_chart, times, lows, highs),
+            "start": times[0],
+            "end": times[-1],
+            "low": min(lows),
+            "high": max(highs),
+        }
+        chart_cache[guild_id] = (key, chart)
+        return chart
+
     # Generate member change graph
     async def generate_member_graph(ctx):
-        files = get_server_files(ctx.guild.id)
         initialize_data(ctx.guild.id)  # Ensure files exist
         
-        data = load_data(files['snapshots'])
-        snapshots = data.get("snapshots", [])
+        snapshots = get_snapshots(ctx.guild.id)
         
         # Save current private setting and update it
         current_private = getConfigData().get("private")
         updateConfigData("private", False)
         
         try:
-            if not snapshots:
+            if not len(snapshots):
                 await forwardEmbedMethod(
                     channel_id=ctx.channel.id,
                     content="no analytics data available yet for this server.",
@@ -995,11 +2326,30 @@ server analytics
                 )
                 return
             
-            # Sort snapshots by timestamp (newest first)
-            snapshots.sort(key=lambda x: datetime.fromisoformat(x["timestamp"]), reverse=True)
+            style = load_server_config(ctx.guild.id).get("chart_style", "image")
+            zone = resolve_timezone()
+            if style == "image" and len(snapshots) >= 2:
+                chart = await get_member_chart(ctx.guild.id)
+                counts = snapshots.columns["member_count"]
+                first_count = get_daily_rows(ctx.guild.id)[0]["member_count"] if get_rollups(ctx.guild.id) else counts[0]
+                format_date = get_time_formatter(zone, "%b %d, %Y")
+                start = format_date(EPOCH + timedelta(seconds=chart["start"]))
+                end = format_date(EPOCH + timedelta(seconds=chart["end"]))
+                await forwardEmbedMethod(
+                    channel_id=ctx.channel.id,
+                    content=f"""**current members:** {counts[-1]:,} ({counts[-1] - first_count:+,} over this period)
+**range:** {chart["low"]:,} – {chart["high"]:,} members
+**period:** {start} → {end}
+
+*chart attached below*""",
+                    title=f"member count history - {ctx.guild.name}",
+                    image=None
+                )
+                await ctx.send(file=discord.File(io.BytesIO(chart["png"]), filename="member_chart.png"))
+                return
             
-            # Take only the 7 most recent snapshots (more than before)
-            recent_snapshots = snapshots[:7]
+            # Take only the 7 most recent snapshots, newest first
+            recent_snapshots = [snapshots.row(i) for i in range(len(snapshots) - 1, max(len(snapshots) - 7, 0) - 1, -1)]
             
             # Group snapshots with the same member count
             grouped_snapshots = []
@@ -1034,6 +2384,11 @@ server analytics
                 else:
                     graph_content += f"**current members:** {current_members:,}\n\n"
             
+            # One formatter per display format for the whole list
+            format_full = get_time_formatter(zone, "%b %d, %I:%M %p")
+            format_clock = get_time_formatter(zone, "%I:%M %p")
+            format_day = get_time_formatter(zone, "%b %d")
+            
             # Process each group and calculate changes
             for i, group in enumerate(grouped_snapshots):
                 snapshot = group[0]  # Use most recent snapshot in group
@@ -1041,7 +2396,7 @@ server analytics
                 
                 # Convert UTC to configured timezone
                 utc_time = datetime.fromisoformat(snapshot["timestamp"])
-                time_str = format_time_in_timezone(utc_time)
+                time_str = format_full(utc_time)
                 
                 # Calculate member change and trend indicator
                 change_str = ""
@@ -1053,15 +2408,17 @@ server analytics
                     change = current_count - next_snapshot["member_count"]
                     if change > 0:
                         change_str = f" (+{change})"
+                        trend = " 📈" if style == "emoji" else ""
                     elif change < 0:
                         change_str = f" ({change})"
+                        trend = " 📉" if style == "emoji" else ""
                 
                 # Create the line with more detail
                 if len(group) > 1:
                     earliest = datetime.fromisoformat(group[-1]["timestamp"])
-                    earliest_time = format_time_in_timezone(earliest, "%i:%m %p")
-                    current_time = format_time_in_timezone(utc_time, "%i:%m %p")
-                    date_str = format_time_in_timezone(utc_time, "%b %d")
+                    earliest_time = format_clock(earliest)
+                    current_time = format_clock(utc_time)
+                    date_str = format_day(utc_time)
                     duration = (utc_time - earliest).total_seconds() / 3600  # hours
                     
                     # Swap the order to show earlier time first